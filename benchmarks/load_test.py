@@ -0,0 +1,410 @@
+"""
+Load-tests a generated API against a throwaway local PostgreSQL.
+
+    python -m benchmarks.load_test --pg-bin /usr/lib/postgresql/16/bin --concurrency 8 --output load.json
+    python -m benchmarks.load_test --pg-host /var/run/postgresql --pg-user postgres --requests 1000
+
+With --pg-bin (or initdb and pg_ctl on the PATH) a new cluster is created in a
+temporary directory, listening on a Unix socket only, and removed afterwards. With
+--pg-host an existing server is used instead, in a new database dropped afterwards.
+
+The fixture schema is seeded, a project is generated from it with the current
+templates and its create_app() is served by a threaded WSGI server. List, get,
+create, update and bulk traffic then runs against every endpoint in turn at the
+given concurrency. The results are p50/p95/p99 latency, requests/sec and SQL
+queries per request for each endpoint. Client and server share one process, so
+the numbers are meant for before/after comparisons, not as absolute capacity.
+"""
+import argparse
+import getpass
+import http.client
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import count
+
+from benchmarks.run_generator import REPOSITORY_ROOT, git_commit
+
+PROJECT_NAME = "LoadTest"
+
+FIXTURE_SCHEMA = """
+CREATE TYPE customer_status AS ENUM ('active', 'suspended', 'closed');
+
+CREATE TABLE customers (
+    id integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    email character varying(255) NOT NULL UNIQUE,
+    name character varying(100) NOT NULL,
+    status customer_status NOT NULL DEFAULT 'active',
+    created_at timestamp with time zone NOT NULL DEFAULT now()
+);
+CREATE INDEX ix_customers_status ON customers (status);
+
+CREATE TABLE products (
+    id integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    sku character varying(32) NOT NULL UNIQUE,
+    title text NOT NULL,
+    price numeric(10, 2) NOT NULL,
+    stock integer NOT NULL DEFAULT 0
+);
+
+CREATE TABLE orders (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    customer_id integer NOT NULL REFERENCES customers (id),
+    product_id integer NOT NULL REFERENCES products (id),
+    quantity integer NOT NULL,
+    placed_at timestamp with time zone NOT NULL DEFAULT now()
+);
+CREATE INDEX ix_orders_customer_id ON orders (customer_id);
+CREATE INDEX ix_orders_product_id ON orders (product_id);
+"""
+
+# Every order points at existing customers and products, so rows is also the id range of both
+FIXTURE_SEED = """
+INSERT INTO customers (email, name, status)
+SELECT 'customer' || n || '@example.com', 'Customer ' || n, (ARRAY['active', 'suspended', 'closed'])[1 + n %% 3]::customer_status
+FROM generate_series(1, %(rows)s) n;
+
+INSERT INTO products (sku, title, price, stock)
+SELECT 'SKU-' || n, 'Product ' || n, n %% 500 + 0.99, n %% 100
+FROM generate_series(1, %(rows)s) n;
+
+INSERT INTO orders (customer_id, product_id, quantity)
+SELECT 1 + n %% %(rows)s, 1 + n * 7 %% %(rows)s, 1 + n %% 5
+FROM generate_series(1, %(rows)s * 10) n;
+
+ANALYZE;
+"""
+
+
+# ============================
+# Throwaway database
+# ============================
+
+@contextmanager
+def throwaway_cluster(pg_bin: str = None):
+    """
+    A new PostgreSQL cluster in a temporary directory, reachable only through a Unix socket there.
+
+    Yields:
+    - Dict: db_info of the cluster's postgres database, as ProjectManager expects it.
+    """
+    initdb = shutil.which("initdb", path=pg_bin)
+    pg_ctl = shutil.which("pg_ctl", path=pg_bin)
+    if not initdb or not pg_ctl:
+        sys.exit("initdb and pg_ctl were not found, pass --pg-bin or use an existing server with --pg-host")
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        sys.exit("PostgreSQL refuses to run as root, use an existing server with --pg-host")
+
+    directory = tempfile.mkdtemp(prefix="db2api-pg-")
+    data = os.path.join(directory, "data")
+    try:
+        subprocess.run([initdb, "-D", data, "-U", "postgres", "--auth=trust", "--no-sync"],
+                       check=True, capture_output=True)
+        options = f"-c listen_addresses='' -k {directory} -c fsync=off -c max_connections=200"
+        subprocess.run([pg_ctl, "-D", data, "-o", options, "-l", os.path.join(directory, "server.log"), "-w", "start"],
+                       check=True, capture_output=True)
+        try:
+            yield {"db_username": "postgres", "db_password": "", "db_host": directory, "db_port": "5432",
+                   "db_name": "postgres"}
+        finally:
+            subprocess.run([pg_ctl, "-D", data, "-m", "fast", "-w", "stop"], capture_output=True)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def throwaway_database(server: dict):
+    """A new database on an existing server, dropped on exit."""
+    import psycopg2
+
+    name = f"db2api_load_{os.getpid()}"
+    connection = psycopg2.connect(user=server["db_username"], password=server["db_password"],
+                                  host=server["db_host"], port=server["db_port"], dbname="postgres")
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE {name}")
+        try:
+            yield {**server, "db_name": name}
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+    finally:
+        connection.close()
+
+
+def seed(db_info: dict, rows: int):
+    import psycopg2
+
+    connection = psycopg2.connect(user=db_info["db_username"], password=db_info["db_password"],
+                                  host=db_info["db_host"], port=db_info["db_port"], dbname=db_info["db_name"])
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(FIXTURE_SCHEMA)
+            cursor.execute(FIXTURE_SEED, {"rows": rows})
+    finally:
+        connection.close()
+
+
+def sqlalchemy_url(db_info: dict) -> str:
+    # A socket directory can't be the host part of a URL, libpq takes it as a query parameter instead
+    if db_info["db_host"].startswith("/"):
+        return "postgresql+psycopg2://{db_username}:{db_password}@/{db_name}?host={db_host}&port={db_port}".format(**db_info)
+    return "postgresql+psycopg2://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}".format(**db_info)
+
+
+# ============================
+# Generated app
+# ============================
+
+def generate_project(db_info: dict, cache_ttl: int) -> str:
+    """Generates the fixture's project in the current directory with the current templates and returns its path."""
+    from core.project_manager import ProjectManager
+    from utils import configure_renderer
+
+    template_path = os.path.join(REPOSITORY_ROOT, "templates")
+    configure_renderer(template_path)
+    manager = ProjectManager(cache_options={"ttl": cache_ttl})
+    manager.template_path = template_path
+    manager.project_name = PROJECT_NAME
+    manager.project_path = os.path.join("projects", PROJECT_NAME)
+    manager.db_info = db_info
+    manager.setup_project_structure()
+    manager.introspect_database()
+    manager.generate_code()
+    return os.path.abspath(manager.project_path)
+
+
+def count_queries(app):
+    """Reports the SQL statements each request ran in an X-Query-Count header."""
+    from flask import g, has_request_context
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def count_statement(*args):
+        if has_request_context():
+            g.query_count = g.get("query_count", 0) + 1
+
+    @app.after_request
+    def add_query_count(response):
+        response.headers["X-Query-Count"] = str(g.get("query_count", 0))
+        return response
+
+
+@contextmanager
+def serve(app):
+    """Serves the app on a free local port from a background thread, yielding the port."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_port
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+# ============================
+# Traffic
+# ============================
+
+def scenarios(rows: int, bulk_size: int):
+    """
+    (endpoint, method, path, body) factories for every generated endpoint of the fixture.
+
+    Each factory is called once per request; ids are drawn from the seeded range and
+    the unique columns of created rows from a per-run counter.
+    """
+    token = f"{os.getpid()}-{int(time.time())}"
+    serial = count()
+
+    def customer():
+        n = next(serial)
+        return {"email": f"load-{token}-{n}@example.com", "name": f"Load {n}", "status": "active"}
+
+    def product():
+        n = next(serial)
+        return {"sku": f"L-{token}-{n}", "title": f"Load {n}", "price": "9.99", "stock": n % 100}
+
+    def order():
+        return {"customer_id": random.randint(1, rows), "product_id": random.randint(1, rows),
+                "quantity": random.randint(1, 5)}
+
+    def some_id():
+        return random.randint(1, rows)
+
+    make = {"customers": customer, "products": product, "orders": order}
+    changes = {"customers": lambda: {"name": f"Renamed {next(serial)}"},
+               "products": lambda: {"stock": random.randint(0, 100)},
+               "orders": lambda: {"quantity": random.randint(1, 5)}}
+
+    plans = []
+    for table in ("customers", "products", "orders"):
+        plans += [
+            (f"GET /{table}/?limit=50", lambda t=table: ("GET", f"/{t}/?limit=50", None)),
+            (f"GET /{table}/<id>", lambda t=table: ("GET", f"/{t}/{some_id()}", None)),
+            (f"POST /{table}/", lambda t=table: ("POST", f"/{t}/", make[t]())),
+            (f"PUT /{table}/<id>", lambda t=table: ("PUT", f"/{t}/{some_id()}", changes[t]())),
+            (f"POST /{table}/bulk", lambda t=table: ("POST", f"/{t}/bulk", [make[t]() for _ in range(bulk_size)])),
+        ]
+    plans += [
+        ("GET /orders/?limit=50&include=customer,product",
+         lambda: ("GET", "/orders/?limit=50&include=customer,product", None)),
+        ("GET /customers/?limit=50&status=active", lambda: ("GET", "/customers/?limit=50&status=active", None)),
+    ]
+    return plans
+
+
+def drive(port: int, make_request, total: int, concurrency: int):
+    """Sends total requests from concurrency threads, each on its own keep-alive connection."""
+    remaining = count()
+    samples = []
+    lock = threading.Lock()
+
+    def worker():
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        own = []
+        try:
+            while next(remaining) < total:
+                method, path, body = make_request()
+                payload = None if body is None else json.dumps(body)
+                headers = {} if body is None else {"Content-Type": "application/json"}
+                started = time.perf_counter()
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                elapsed = time.perf_counter() - started
+                own.append((elapsed, response.status, int(response.getheader("X-Query-Count", 0))))
+        finally:
+            connection.close()
+            with lock:
+                samples.extend(own)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return samples, time.perf_counter() - started
+
+
+def summarize(endpoint: str, samples, wall_time: float) -> dict:
+    latencies = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "endpoint": endpoint,
+        "requests": len(samples),
+        "errors": sum(1 for _, status, _ in samples if status >= 400),
+        "requests_per_sec": round(len(samples) / wall_time, 1) if wall_time else 0.0,
+        "p50_ms": round(percentiles[49], 2),
+        "p95_ms": round(percentiles[94], 2),
+        "p99_ms": round(percentiles[98], 2),
+        "queries_per_request": round(statistics.mean(queries for _, _, queries in samples), 2),
+    }
+
+
+def run_load_test(db_info: dict, args) -> list:
+    seed(db_info, args.rows)
+    os.environ["DATABASE_URL"] = sqlalchemy_url(db_info)
+    os.environ["RESPONSE_CACHE_TTL"] = str(args.cache_ttl)
+
+    workdir = tempfile.mkdtemp(prefix="db2api-load-")
+    try:
+        os.chdir(workdir)
+        project_path = generate_project(db_info, args.cache_ttl)
+        sys.path.insert(0, project_path)
+        from run import create_app
+
+        app = create_app()
+        count_queries(app)
+        results = []
+        with serve(app) as port:
+            for endpoint, make_request in scenarios(args.rows, args.bulk_size):
+                if args.endpoint and not any(pattern in endpoint for pattern in args.endpoint):
+                    continue
+                drive(port, make_request, args.warmup, args.concurrency)
+                samples, wall_time = drive(port, make_request, args.requests, args.concurrency)
+                result = summarize(endpoint, samples, wall_time)
+                logging.info(f"{endpoint:<50} {result['requests_per_sec']:>8.1f} req/s  p50 {result['p50_ms']:>7.2f}ms  "
+                             f"p95 {result['p95_ms']:>7.2f}ms  p99 {result['p99_ms']:>7.2f}ms  "
+                             f"{result['queries_per_request']:>5.2f} queries/req  {result['errors']} errors")
+                results.append(result)
+        return results
+    finally:
+        os.chdir(REPOSITORY_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a generated API against a throwaway local PostgreSQL.")
+    parser.add_argument("--pg-bin", default=None, help="Directory of initdb and pg_ctl for a throwaway cluster (default: PATH)")
+    parser.add_argument("--pg-host", default=None,
+                        help="Host or socket directory of an existing server to create a throwaway database on instead")
+    parser.add_argument("--pg-port", default="5432", help="Port of the existing server (default: 5432)")
+    parser.add_argument("--pg-user", default=getpass.getuser(), help="User on the existing server (default: current user)")
+    parser.add_argument("--pg-password", default="", help="Password on the existing server")
+    parser.add_argument("--rows", type=int, default=10000,
+                        help="Seeded customers and products, ten times as many orders (default: 10000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client connections (default: 8)")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per endpoint (default: 500)")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint first (default: 20)")
+    parser.add_argument("--bulk-size", type=int, default=100, help="Rows per bulk request (default: 100)")
+    parser.add_argument("--cache-ttl", type=int, default=0,
+                        help="Response cache lifetime of the app, 0 measures the database path (default: 0)")
+    parser.add_argument("--endpoint", action="append", default=[],
+                        help="Only run endpoints containing this text, repeatable")
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.pg_host:
+        server = {"db_username": args.pg_user, "db_password": args.pg_password, "db_host": args.pg_host,
+                  "db_port": args.pg_port, "db_name": "postgres"}
+        database = throwaway_database(server)
+    else:
+        database = throwaway_cluster(args.pg_bin)
+
+    with database as db_info:
+        results = run_load_test(db_info, args)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "options": {"rows": args.rows, "concurrency": args.concurrency, "requests": args.requests,
+                    "bulk_size": args.bulk_size, "cache_ttl": args.cache_ttl},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+        logging.info(f"Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
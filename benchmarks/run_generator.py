@@ -0,0 +1,205 @@
+"""
+Benchmarks the generator over synthetic schemas, without a database.
+
+    python -m benchmarks.run_generator --sizes 10 100 1000 --output bench.json
+
+Each size runs in its own process, so that its peak RSS is its own, inside a
+temporary directory. The whole pipeline runs against the made-up schema, phase by
+phase, and the results are printed (or written with --output) as JSON to compare
+across commits.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+PROJECT_NAME = "Bench"
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of this process and of its largest finished child, in MiB (ru_maxrss is in KiB on Linux)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max(own, children) / scale, 1)
+
+
+def count_files(path: str) -> int:
+    return sum(len(files) for root, _, files in os.walk(path) if "__pycache__" not in root)
+
+
+class PhaseTimer:
+    """Records wall time, files written and the RSS high-water mark of each phase of a run."""
+
+    def __init__(self, project_path: str):
+        self.project_path = project_path
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name: str):
+        files_before = count_files(self.project_path)
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+        files = max(count_files(self.project_path) - files_before, 0)
+        self.phases.append({
+            "name": name,
+            "wall_time": round(elapsed, 4),
+            "files": files,
+            "files_per_sec": round(files / elapsed, 1) if elapsed and files else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+        })
+
+
+def run_size(tables: int, options: dict) -> dict:
+    """Generates a project for a synthetic schema of the given size in a temporary directory and times each phase."""
+    from benchmarks.synthetic_schema import synthetic_catalog
+    from core.project_manager import ProjectManager
+    from core.schema_introspector import build_schema
+    from utils import shared_renderer
+
+    class BenchmarkManager(ProjectManager):
+        """A ProjectManager whose phases are timed by the benchmark rather than by its profiler."""
+
+        def phase(self, name: str):
+            return timer.phase(name)
+
+    catalog = synthetic_catalog(tables, fk_density=options["fk_density"], enum_ratio=options["enum_ratio"],
+                                wide_ratio=options["wide_ratio"], seed=options["seed"])
+    template_path = os.path.join(REPOSITORY_ROOT, "templates")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        manager = BenchmarkManager(workers=options["workers"], executor=options["executor"],
+                                   template_type=options["template_type"], project_name=PROJECT_NAME,
+                                   db_info={"db_username": "bench", "db_password": "", "db_host": "localhost",
+                                            "db_port": "5432", "db_name": "bench"})
+        manager.template_path = template_path
+        manager.project_path = os.path.join("projects", PROJECT_NAME)
+        timer = PhaseTimer(manager.project_path)
+        started = time.perf_counter()
+
+        # ProjectManager.run_phases() without the database: the catalog rows stand in for introspection,
+        # then generate_code() times its own phases
+        with timer.phase("configure_renderer"):
+            shared_renderer(template_path)
+        with timer.phase("introspect"):
+            schema = build_schema("public", catalog["tables"], catalog["columns"], catalog["constraints"],
+                                  catalog["enums"], catalog["indexes"])
+            manager.schemas = [schema]
+        with timer.phase("setup_project_structure"):
+            manager.setup_project_structure()
+        manager.generate_code()
+        total = time.perf_counter() - started
+
+        # A second run over the unchanged schema, which the manifest should turn into a no-op
+        phases = list(timer.phases)
+        rerun_started = time.perf_counter()
+        manager.generate_code()
+        rerun = time.perf_counter() - rerun_started
+        files = count_files(manager.project_path)
+        os.chdir(REPOSITORY_ROOT)
+
+    return {
+        "tables": tables,
+        "mappable_tables": len(schema.mappable_tables()),
+        "columns": len(catalog["columns"]),
+        "foreign_keys": sum(1 for row in catalog["constraints"] if row[2] == "f"),
+        "files": files,
+        "wall_time": round(total, 4),
+        "files_per_sec": round(files / total, 1) if total else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "unchanged_rerun_wall_time": round(rerun, 4),
+        "phases": phases,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPOSITORY_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generator over synthetic schemas.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Numbers of tables to benchmark (default: 10 100 1000 10000)")
+    parser.add_argument("--fk-density", type=float, default=1.0,
+                        help="Average number of foreign keys per table (default: 1.0)")
+    parser.add_argument("--enum-ratio", type=float, default=0.2,
+                        help="Share of tables with an enum column (default: 0.2)")
+    parser.add_argument("--wide-ratio", type=float, default=0.05,
+                        help="Share of tables with 60 to 120 columns (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic schemas (default: 0)")
+    parser.add_argument("--workers", type=int, default=1, help="Render workers, as in main.py (default: 1)")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                        help="Worker pool type used when --workers is above 1 (default: process)")
+    parser.add_argument("--template-type", choices=["default", "async"], default="default",
+                        help="App type to generate (default: default)")
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--single", type=int, default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {"fk_density": args.fk_density, "enum_ratio": args.enum_ratio, "wide_ratio": args.wide_ratio,
+               "seed": args.seed, "workers": args.workers, "executor": args.executor,
+               "template_type": args.template_type}
+
+    if args.single is not None:
+        # Child process: generation logs would drown the results
+        logging.disable(logging.INFO)
+        print(json.dumps(run_size(args.single, options)))
+        return
+
+    results = []
+    for size in args.sizes:
+        logging.info(f"Benchmarking {size} tables")
+        command = [sys.executable, "-m", "benchmarks.run_generator", "--single", str(size),
+                   "--fk-density", str(args.fk_density), "--enum-ratio", str(args.enum_ratio),
+                   "--wide-ratio", str(args.wide_ratio), "--seed", str(args.seed), "--workers", str(args.workers),
+                   "--executor", args.executor, "--template-type", args.template_type]
+        completed = subprocess.run(command, cwd=REPOSITORY_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            sys.exit(f"Benchmark of {size} tables failed")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        logging.info(f"{size} tables: {result['files']} files in {result['wall_time']:.2f}s "
+                     f"({result['files_per_sec']:.0f} files/s), peak RSS {result['peak_rss_mb']} MiB, "
+                     f"unchanged rerun {result['unchanged_rerun_wall_time']:.2f}s")
+        results.append(result)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": options,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+        logging.info(f"Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
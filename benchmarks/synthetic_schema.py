@@ -0,0 +1,111 @@
+import random
+from typing import Dict, List, Tuple
+from core.schema_introspector import build_schema
+from core.schema_model import Schema
+
+# (format_type() output, typtype, typcategory, typname) of the column types synthetic tables draw from
+COLUMN_TYPES = [
+    ("integer", "b", "N", "int4"),
+    ("bigint", "b", "N", "int8"),
+    ("character varying(64)", "b", "S", "varchar"),
+    ("character varying(255)", "b", "S", "varchar"),
+    ("text", "b", "S", "text"),
+    ("numeric(12,2)", "b", "N", "numeric"),
+    ("boolean", "b", "B", "bool"),
+    ("timestamp with time zone", "b", "D", "timestamptz"),
+    ("date", "b", "D", "date"),
+    ("uuid", "b", "U", "uuid"),
+    ("jsonb", "b", "U", "jsonb"),
+    ("bytea", "b", "U", "bytea"),
+]
+
+ENUM_LABELS = ["draft", "active", "suspended", "archived"]
+
+
+def column_row(oid: int, name: str, formatted_type: str, typtype: str = "b", typcategory: str = "N",
+               typname: str = "int4", element_type: str = None, is_nullable: bool = True,
+               default: str = None, is_identity: bool = False, type_schema: str = "pg_catalog") -> Tuple:
+    """One row of COLUMNS_QUERY."""
+    return (oid, name, formatted_type, typtype, typcategory, typname, type_schema, element_type,
+            is_nullable, default, is_identity)
+
+
+def synthetic_catalog(tables: int, fk_density: float = 1.0, enum_ratio: float = 0.2, wide_ratio: float = 0.05,
+                      seed: int = 0) -> Dict[str, List[Tuple]]:
+    """
+    Catalog rows, shaped like the results of the introspection queries, for a made-up schema.
+
+    Tables have an identity primary key and a handful of typed columns. On top of that:
+    - fk_density: average number of foreign keys per table, each to an earlier table and
+      backed by an index half of the time;
+    - enum_ratio: share of tables with a column of one of the schema's enum types;
+    - wide_ratio: share of tables with 60 to 120 columns.
+    One table in fifty has no primary key and one in twenty is a junction table with a
+    composite primary key made of two foreign keys.
+
+    Returns:
+    - Dict: "tables", "columns", "constraints", "enums" and "indexes" rows.
+    """
+    rng = random.Random(seed)
+    enum_types = [f"status_{n}" for n in range(max(1, tables // 50))]
+    catalog = {"tables": [], "columns": [], "constraints": [], "indexes": [],
+               "enums": [("public", name, label) for name in enum_types for label in ENUM_LABELS]}
+    keyed = []
+
+    for n in range(tables):
+        oid, name = 10000 + n, f"table_{n:05d}"
+        catalog["tables"].append((oid, name, rng.choice([0, 100, 10_000, 2_000_000])))
+        columns, constraints, indexes = catalog["columns"], catalog["constraints"], catalog["indexes"]
+
+        if len(keyed) > 1 and rng.random() < 0.05:
+            # Junction table keyed by two foreign keys
+            left, right = rng.sample(keyed, 2)
+            for target in (left, right):
+                columns.append(column_row(oid, f"{target}_id", "integer", is_nullable=False))
+                constraints.append((oid, f"{name}_{target}_id_fkey", "f", [f"{target}_id"], "public", target, ["id"]))
+            constraints.append((oid, f"{name}_pkey", "p", [f"{left}_id", f"{right}_id"], None, None, []))
+            indexes.append((oid, f"{name}_pkey", True, True, "btree", False, [f"{left}_id", f"{right}_id"]))
+            continue
+
+        has_primary_key = rng.random() >= 0.02
+        columns.append(column_row(oid, "id", "integer", is_nullable=False, is_identity=has_primary_key))
+        if has_primary_key:
+            constraints.append((oid, f"{name}_pkey", "p", ["id"], None, None, []))
+            indexes.append((oid, f"{name}_pkey", True, True, "btree", False, ["id"]))
+
+        width = rng.randint(60, 120) if rng.random() < wide_ratio else rng.randint(3, 12)
+        for c in range(width):
+            formatted_type, typtype, typcategory, typname = rng.choice(COLUMN_TYPES)
+            columns.append(column_row(oid, f"col_{c}", formatted_type, typtype, typcategory, typname,
+                                      is_nullable=rng.random() < 0.7))
+        columns.append(column_row(oid, "tags", "text[]", "b", "A", "_text", "text"))
+        columns.append(column_row(oid, "created_at", "timestamp with time zone", "b", "D", "timestamptz",
+                                  is_nullable=False, default="now()"))
+        if rng.random() < enum_ratio:
+            enum_type = rng.choice(enum_types)
+            columns.append(column_row(oid, "status", enum_type, "e", "E", enum_type, is_nullable=False,
+                                      type_schema="public"))
+            indexes.append((oid, f"ix_{name}_status", False, False, "btree", False, ["status"]))
+        if rng.random() < 0.3:
+            columns.append(column_row(oid, "code", "character varying(32)", "b", "S", "varchar", is_nullable=False))
+            constraints.append((oid, f"{name}_code_key", "u", ["code"], None, None, []))
+            indexes.append((oid, f"{name}_code_key", True, False, "btree", False, ["code"]))
+
+        foreign_keys = int(fk_density) + (rng.random() < fk_density - int(fk_density))
+        for target in rng.sample(keyed, min(foreign_keys, len(keyed))):
+            columns.append(column_row(oid, f"{target}_id", "integer"))
+            constraints.append((oid, f"{name}_{target}_id_fkey", "f", [f"{target}_id"], "public", target, ["id"]))
+            if rng.random() < 0.5:
+                indexes.append((oid, f"ix_{name}_{target}_id", False, False, "btree", False, [f"{target}_id"]))
+
+        if has_primary_key:
+            keyed.append(name)
+
+    return catalog
+
+
+def synthetic_schema(tables: int, **options) -> Schema:
+    """A made-up schema of the given size, built through the same code path as introspection, see synthetic_catalog."""
+    catalog = synthetic_catalog(tables, **options)
+    return build_schema("public", catalog["tables"], catalog["columns"], catalog["constraints"],
+                        catalog["enums"], catalog["indexes"])
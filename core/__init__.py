@@ -1,2 +1,10 @@
-from .db_connector import DatabaseConnector
 from .db_info_manager import save_db_info, load_db_info
+from .schema_introspector import introspect_schema
+
+
+def __getattr__(name):
+    # DatabaseConnector pulls in psycopg2, which generating from a snapshot never needs
+    if name == "DatabaseConnector":
+        from .db_connector import DatabaseConnector
+        return DatabaseConnector
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+from utils.file_manager import path_exists, read_file
+
+# Projects generated side by side by default
+BATCH_JOBS = 4
+
+SUMMARY_COLUMNS = ("project", "status", "tables", "written", "skipped", "seconds")
+
+
+def load_batch_manifest(path: str) -> Dict:
+    """
+    Reads a batch manifest and checks its structure before anything is generated.
+
+    The manifest is a JSON object with a "projects" list and optional default "args".
+    Each project has a unique "name", optional "args" given as command line arguments of
+    main.py, appended to the default ones, and an optional "connection" with db_host,
+    db_port, db_name, db_username and either db_password or db_password_env, the
+    environment variable holding it. A project without a connection is generated from
+    its --snapshot or from the configuration saved by an earlier run.
+
+    Raises:
+    - ValueError: If the manifest is malformed.
+    """
+    if not path_exists(path):
+        raise FileNotFoundError(f"Batch manifest {path} not found!")
+    manifest = json.loads(read_file(path))
+    projects = manifest.get("projects") if isinstance(manifest, dict) else None
+    if not isinstance(projects, list) or not projects:
+        raise ValueError(f"Batch manifest {path} has no \"projects\" list")
+    names = [project.get("name") if isinstance(project, dict) else None for project in projects]
+    if not all(isinstance(name, str) and name for name in names):
+        raise ValueError(f"Every project of batch manifest {path} needs a \"name\"")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Batch manifest {path} lists projects {', '.join(duplicates)} more than once")
+    for project in [manifest] + projects:
+        if not isinstance(project.get("args", []), list):
+            raise ValueError(f"\"args\" of batch manifest {path} must be lists of command line arguments")
+    return manifest
+
+
+def connection_info(connection: Dict[str, str]) -> Dict[str, str]:
+    """The db_info of a manifest connection, with a db_password_env reference replaced by the password."""
+    db_info = dict(connection or {})
+    variable = db_info.pop("db_password_env", None)
+    if variable:
+        if variable not in os.environ:
+            raise ValueError(f"Environment variable {variable} holding the database password is not set")
+        db_info["db_password"] = os.environ[variable]
+    return db_info
+
+
+def run_project(name: str, create_manager: Callable) -> Dict:
+    """Generates one project, turning any failure into its status so that the other projects carry on."""
+    # Log lines of the project carry its name through the thread name
+    threading.current_thread().name = name
+    started = time.perf_counter()
+    result = {"project": name, "status": "ok", "tables": None, "written": None, "skipped": None}
+    manager = None
+    try:
+        manager = create_manager()
+        manager.run()
+    except Exception as error:
+        logging.exception(f"Generating project {name} failed")
+        result["status"] = "failed"
+        result["error"] = f"{type(error).__name__}: {str(error).strip()}"
+    if manager is not None and manager.schemas:
+        result["tables"] = sum(len(schema.mappable_tables()) for schema in manager.schemas)
+    if manager is not None and manager.output is not None and result["status"] == "ok":
+        report = manager.output.report()
+        result["written"], result["skipped"] = report["files_written"], report["files_skipped"]
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(projects: List[Tuple[str, Callable]], jobs: int = BATCH_JOBS) -> List[Dict]:
+    """
+    Generates every project in this process, up to jobs of them at a time.
+
+    Args:
+    - projects (List[Tuple[str, Callable]]): Project name and a function creating its ProjectManager.
+    - jobs (int): Projects generated concurrently.
+
+    Returns:
+    - List[Dict]: One result per project, in manifest order, see run_project.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return list(executor.map(lambda project: run_project(*project), projects))
+
+
+def format_summary(results: List[Dict], wall_time: float) -> str:
+    """A table of the projects' status, table and file counts and timing, with the failures' errors below it."""
+    rows = [SUMMARY_COLUMNS] + [tuple("-" if result[column] is None else str(result[column])
+                                      for column in SUMMARY_COLUMNS) for result in results]
+    widths = [max(len(row[index]) for row in rows) for index in range(len(SUMMARY_COLUMNS))]
+    lines = ["  ".join(value.ljust(width) if index < 2 else value.rjust(width)
+                       for index, (value, width) in enumerate(zip(row, widths))) for row in rows]
+    failed = [result for result in results if result["status"] != "ok"]
+    lines += [f"{result['project']}: {result['error']}" for result in failed]
+    lines.append(f"{len(results) - len(failed)} of {len(results)} project(s) generated in {wall_time:.2f}s")
+    return "\n".join(lines)
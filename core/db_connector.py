@@ -1,5 +1,8 @@
+import threading
+import time
 import psycopg2
 from typing import List, Tuple, Dict
+from utils.profiler import record_query
 
 class DatabaseConnector:
     def __init__(self, db_info: Dict[str, str]):
@@ -35,8 +38,11 @@ class DatabaseConnector:
         Returns:
         - List[Tuple]: Result of the query.
         """
+        started = time.perf_counter()
         self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        rows = self.cursor.fetchall()
+        record_query(time.perf_counter() - started)
+        return rows
 
     def close(self):
         """
@@ -44,3 +50,37 @@ class DatabaseConnector:
         """
         self.cursor.close()
         self.connection.close()
+
+
+class ConnectorPool:
+    """
+    Hands each thread its own DatabaseConnector, opened on its first query and closed with the pool.
+
+    A psycopg2 connection runs one query at a time, so concurrent introspection needs one per thread.
+    """
+
+    def __init__(self, db_info: Dict[str, str]):
+        self.db_info = db_info
+        self._local = threading.local()
+        self._connectors: List[DatabaseConnector] = []
+        self._lock = threading.Lock()
+
+    def connector(self) -> DatabaseConnector:
+        connector = getattr(self._local, "connector", None)
+        if connector is None:
+            connector = self._local.connector = DatabaseConnector(self.db_info)
+            with self._lock:
+                self._connectors.append(connector)
+        return connector
+
+    def close(self):
+        with self._lock:
+            for connector in self._connectors:
+                connector.close()
+            self._connectors.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
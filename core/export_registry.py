@@ -0,0 +1,87 @@
+import logging
+from typing import Dict, List, Set, Tuple
+from utils.file_manager import write_file
+
+
+class ExportRegistry:
+    """
+    Collects the symbols each generated package exports and writes every __init__.py once.
+
+    Packages are identified by their directory under app/, e.g. "models" or "controllers".
+    A lazy registry writes packages that import a module only when one of its symbols is
+    first accessed (PEP 562), so importing one module of a package does not import them all.
+    """
+
+    def __init__(self, lazy: bool = False):
+        self.lazy = lazy
+        self.exports: Dict[str, Set[Tuple[str, str]]] = {}
+        self.groups: Dict[str, List[List[str]]] = {}
+
+    def register(self, directory_name: str, module_name: str, symbol: str):
+        self.exports.setdefault(directory_name, set()).add((module_name, symbol))
+
+    def register_group(self, directory_name: str, module_names: List[str]):
+        """Modules of a package that a lazy package imports together, e.g. models whose relationships name each other."""
+        self.groups.setdefault(directory_name, []).append(sorted(module_names))
+
+    def render(self, directory_name: str) -> str:
+        """
+        Builds the content of a package __init__.py, with imports and __all__ sorted.
+
+        Args:
+        - directory_name (str): Package directory under app/.
+
+        Returns:
+        - str: Content of the __init__.py file.
+        """
+        if self.lazy:
+            return self.render_lazy(directory_name)
+        exports = sorted(self.exports.get(directory_name, ()))
+        lines = [f"# Auto-generated __init__.py for {directory_name}"]
+        lines += [f"from .{module_name} import {symbol}" for module_name, symbol in exports]
+        lines.append("__all__ = [" + ", ".join(f"'{symbol}'" for symbol in sorted(s for _, s in exports)) + "]")
+        return "\n".join(lines) + "\n"
+
+    def render_lazy(self, directory_name: str) -> str:
+        """Builds a package __init__.py whose module-level __getattr__ imports a symbol's module, and its group, on first access."""
+        exports = sorted(self.exports.get(directory_name, ()), key=lambda export: export[1])
+        lines = [f"# Auto-generated __init__.py for {directory_name}",
+                 "from importlib import import_module",
+                 "",
+                 "# Symbol -> module defining it, imported on first access",
+                 "_EXPORTS = {"]
+        lines += [f"    '{symbol}': '{module_name}'," for module_name, symbol in exports]
+        groups = sorted(self.groups.get(directory_name, ()))
+        lines += ["}",
+                  "# Modules imported together whenever one of them is",
+                  "_GROUPS = [" if groups else "_GROUPS = []"]
+        if groups:
+            lines += ["    (" + ", ".join(f"'{module_name}'" for module_name in group) + ")," for group in groups]
+            lines.append("]")
+        lines += [
+                  "_GROUP_OF = {module_name: group for group in _GROUPS for module_name in group}",
+                  "__all__ = [" + ", ".join(f"'{symbol}'" for _, symbol in exports) + "]",
+                  "",
+                  "",
+                  "def __getattr__(name):",
+                  "    module_name = _EXPORTS.get(name)",
+                  "    if module_name is None:",
+                  "        raise AttributeError(f\"module {__name__!r} has no attribute {name!r}\")",
+                  "    for related in _GROUP_OF.get(module_name, ()):",
+                  "        import_module(f\"{__name__}.{related}\")",
+                  "    value = getattr(import_module(f\"{__name__}.{module_name}\"), name)",
+                  "    # Later lookups find the symbol without calling __getattr__",
+                  "    globals()[name] = value",
+                  "    return value",
+                  "",
+                  "",
+                  "def __dir__():",
+                  "    return sorted(list(globals()) + __all__)"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, project_name: str):
+        """Writes the __init__.py of every registered package of the project."""
+        for directory_name in sorted(self.exports):
+            init_path = f"projects/{project_name}/app/{directory_name}/__init__.py"
+            if write_file(init_path, self.render(directory_name)):
+                logging.debug(f"Wrote __init__.py for {directory_name} at {init_path}")
@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+import logging
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+from core.schema_model import Schema, Table
+from core.structure_generator import count_strategy_for, generated_foreign_keys, output_name_for, relationships_for
+from utils.file_manager import path_exists, read_file, write_file
+
+MANIFEST_FILENAME = "generation_manifest.json"
+MANIFEST_VERSION = 1
+
+# Generator modules whose code shapes the output as much as the templates do
+GENERATOR_MODULES = [
+    os.path.join(os.path.dirname(__file__), "structure_generator.py"),
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "utils", "custom_filters.py"),
+]
+
+
+def get_manifest_path(project_name: str) -> str:
+    return f"projects/{project_name}/{MANIFEST_FILENAME}"
+
+
+def load_manifest(project_name: str) -> Optional[Dict]:
+    path = get_manifest_path(project_name)
+    if not path_exists(path):
+        return None
+    try:
+        manifest = json.loads(read_file(path))
+    except ValueError:
+        logging.warning(f"Ignoring unreadable manifest at {path}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(project_name: str, templates_hash: str, fingerprints: Dict[str, str]) -> None:
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "templates_hash": templates_hash,
+        "tables": dict(sorted(fingerprints.items())),
+    }
+    write_file(get_manifest_path(project_name), json.dumps(manifest, indent=2) + "\n")
+
+
+def hash_json(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def table_fingerprint(table: Table, schema: Schema, count_strategy: str = "exact") -> str:
+    """
+    Hashes everything the generated files of a table depend on.
+
+    Besides the table itself this covers the labels of the enum types it uses,
+    which of its foreign key targets are generated, which generated tables
+    reference it and the relationships both sides end up with. Row estimates are left out, they change on every ANALYZE without
+    changing the code; only the count strategy picked from them is hashed.
+    """
+    definition = asdict(table)
+    definition.pop("estimated_rows")
+    return hash_json({
+        "table": definition,
+        "enums": {column.enum_type: schema.enums.get(column.enum_type, [])
+                  for column in table.columns if column.enum_type},
+        "generated_targets": sorted({fk.referred_table for fk in generated_foreign_keys(table, schema)}),
+        "referencing_tables": sorted({other.name for other, _ in schema.referencing(table)}),
+        "relationships": relationships_for(table, schema),
+        "count_strategy": count_strategy,
+    })
+
+
+def schema_fingerprints(schema: Schema, count_options: Dict = None) -> Dict[str, str]:
+    """Fingerprints of the mappable tables by output name, unique across schemas."""
+    return {output_name_for(table): table_fingerprint(table, schema, count_strategy_for(table, count_options))
+            for table in schema.mappable_tables()}
+
+
+def templates_fingerprint(template_path: str, options: Dict = None) -> str:
+    """Hashes the template files, the generator modules and the generation options."""
+    digest = hashlib.sha256()
+    paths = [os.path.join(root, name) for root, _, files in os.walk(template_path)
+             if "__pycache__" not in root for name in files]
+    labelled_paths = [(os.path.relpath(path, template_path), path) for path in sorted(paths)]
+    labelled_paths += [(os.path.basename(path), path) for path in GENERATOR_MODULES]
+    for label, path in labelled_paths:
+        digest.update(label.encode("utf-8"))
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(hash_json(options or {}).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def plan_regeneration(previous: Optional[Dict], templates_hash: str,
+                      fingerprints: Dict[str, str], full: bool = False) -> Tuple[List[str], List[str]]:
+    """
+    Compares the current schema with the manifest of the previous run.
+
+    A full run regenerates every table, but still drops the code of the tables that the
+    previous run generated and that are gone since.
+
+    Returns:
+    - Tuple[List[str], List[str]]: Names of the tables to (re)generate and of the tables that were dropped.
+    """
+    previous_tables = previous.get("tables", {}) if previous else {}
+    dropped = sorted(set(previous_tables) - set(fingerprints))
+
+    # New templates or generator code invalidate every table
+    if full or not previous or previous.get("templates_hash") != templates_hash:
+        return sorted(fingerprints), dropped
+
+    changed = sorted(name for name, fingerprint in fingerprints.items() if previous_tables.get(name) != fingerprint)
+    return changed, dropped
@@ -0,0 +1,167 @@
+import json
+import logging
+import re
+from typing import Dict, List, Tuple
+from core.schema_model import Schema, Table
+from core.structure_generator import filterable_columns, url_prefix_for
+from utils.file_manager import write_file
+
+REPORT_FILENAME = "index_report.json"
+
+# Tables estimated above this many rows are worth paginating rather than reading whole
+LARGE_TABLE_ROWS = 1_000_000
+# Sequential scans on tables smaller than this are usually cheaper than an index lookup
+SEQ_SCAN_MIN_ROWS = 10_000
+
+# Key types that make every index entry, and every index holding the key, large
+WIDE_KEY_TYPES = {"text", "bytea", "json", "jsonb", "xml", "numeric"}
+WIDE_KEY_LENGTH = 64
+
+TABLE_STATS_QUERY = """
+SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup
+FROM pg_catalog.pg_stat_user_tables
+WHERE schemaname = %s;
+"""
+
+IDENTIFIER_PATTERN = re.compile(r'^[a-z_][a-z0-9_$]*$')
+
+
+def collect_table_stats(connector, schema_name: str = "public") -> Dict[str, Dict[str, int]]:
+    """Scan counters of every table in the schema since the statistics were last reset."""
+    return {
+        name: {"seq_scan": seq_scan, "seq_tup_read": seq_tup_read, "idx_scan": idx_scan, "live_rows": live_rows}
+        for name, seq_scan, seq_tup_read, idx_scan, live_rows in connector.execute_query(TABLE_STATS_QUERY, (schema_name,))
+    }
+
+
+def quote_identifier(name: str) -> str:
+    return name if IDENTIFIER_PATTERN.match(name) else '"' + name.replace('"', '""') + '"'
+
+
+def create_index_statement(table: Table, columns: List[str]) -> str:
+    index_name = f"ix_{table.name}_{'_'.join(columns)}"[:63]
+    return "CREATE INDEX CONCURRENTLY {index} ON {schema}.{table} ({columns});".format(
+        index=quote_identifier(index_name),
+        schema=quote_identifier(table.schema),
+        table=quote_identifier(table.name),
+        columns=", ".join(quote_identifier(column) for column in columns)
+    )
+
+
+def is_covered(table: Table, columns: List[str]) -> bool:
+    """Whether a full btree index starts with the given columns, in any order."""
+    return any(index.method == "btree" and not index.is_partial and set(index.columns[:len(columns)]) == set(columns)
+               for index in table.indexes)
+
+
+def is_wide(table: Table, column_name: str) -> bool:
+    column = table.column(column_name)
+    if column.data_type in WIDE_KEY_TYPES:
+        return True
+    if column.data_type in ("character varying", "character"):
+        return column.length is None or column.length > WIDE_KEY_LENGTH
+    return False
+
+
+def unindexed_foreign_keys(table: Table) -> List[Dict]:
+    """Foreign keys whose columns lead no index: deletes on the referenced table and joins back both scan this one."""
+    return [{"table": table.qualified_name, "constraint": fk.name, "columns": fk.columns,
+             "references": Table(fk.referred_table, fk.referred_schema).qualified_name,
+             "suggestion": create_index_statement(table, fk.columns)}
+            for fk in table.foreign_keys if not is_covered(table, fk.columns)]
+
+
+def wide_keys(table: Table, lookup_columns: List[str]) -> List[Dict]:
+    """Primary key and lookup columns of wide types, which bloat every index and every FK pointing at them."""
+    findings = []
+    for name in table.primary_key + [name for name in lookup_columns if name not in table.primary_key]:
+        if is_wide(table, name):
+            column = table.column(name)
+            findings.append({"table": table.qualified_name, "column": name,
+                             "role": "primary key" if name in table.primary_key else "lookup",
+                             "type": column.data_type if column.length is None else f"{column.data_type}({column.length})"})
+    return findings
+
+
+def seq_scan_hotspots(schema: Schema, table_stats: Dict[str, Dict[str, int]]) -> List[Dict]:
+    """Tables of some size read more often by sequential scans than through an index, worst first."""
+    hotspots = [{"table": schema.tables[name].qualified_name, **stats} for name, stats in table_stats.items()
+                if name in schema.tables and stats["live_rows"] >= SEQ_SCAN_MIN_ROWS
+                and stats["seq_scan"] > stats["idx_scan"]]
+    return sorted(hotspots, key=lambda hotspot: hotspot["seq_tup_read"], reverse=True)
+
+
+def build_index_report(schema: Schema, table_stats: Dict[str, Dict[str, int]] = None,
+                       filter_opt_in: Dict[str, List[str]] = None) -> Dict:
+    """
+    Finds the slow paths of the generated API in the schema.
+
+    Args:
+    - schema (Schema): The introspected schema.
+    - table_stats (Dict): Per-table scan counters, see collect_table_stats.
+    - filter_opt_in (Dict): Columns opted into filtering without an index, by schema-qualified table name.
+
+    Returns:
+    - Dict: Findings by kind plus the CREATE INDEX statements the generated routes would need.
+    """
+    filter_opt_in = filter_opt_in or {}
+    report = {
+        "unindexed_foreign_keys": [],
+        "wide_keys": [],
+        "large_unpaginated_tables": [],
+        "unindexed_filters": [],
+        "seq_scan_hotspots": seq_scan_hotspots(schema, table_stats or {}),
+        "suggested_indexes": [],
+    }
+    for table in schema.mappable_tables():
+        opt_in = filter_opt_in.get(table.qualified_name, [])
+        report["unindexed_foreign_keys"] += unindexed_foreign_keys(table)
+        report["wide_keys"] += wide_keys(table, filterable_columns(table, opt_in))
+        if table.estimated_rows >= LARGE_TABLE_ROWS:
+            report["large_unpaginated_tables"].append({"table": table.qualified_name,
+                                                       "estimated_rows": table.estimated_rows,
+                                                       "route": f"GET {url_prefix_for(table)}/"})
+        # Opted-in filters are exactly the ones without an index behind them
+        report["unindexed_filters"] += [{"table": table.qualified_name, "column": name,
+                                         "suggestion": create_index_statement(table, [name])}
+                                        for name in opt_in if table.column(name) and not is_covered(table, [name])]
+
+    report["suggested_indexes"] = sorted({finding["suggestion"] for finding in
+                                          report["unindexed_foreign_keys"] + report["unindexed_filters"]})
+    return report
+
+
+def merge_index_reports(reports: List[Dict]) -> Dict:
+    """Combines the reports of several schemas into one, keeping the worst hotspots first."""
+    merged = build_index_report(Schema())
+    for report in reports:
+        for key, findings in report.items():
+            merged[key] += findings
+    merged["seq_scan_hotspots"].sort(key=lambda hotspot: hotspot["seq_tup_read"], reverse=True)
+    merged["suggested_indexes"] = sorted(set(merged["suggested_indexes"]))
+    return merged
+
+
+def summarize_index_report(report: Dict) -> List[str]:
+    lines = []
+    for finding in report["unindexed_foreign_keys"]:
+        lines.append(f"{finding['table']}.{finding['constraint']}: foreign key ({', '.join(finding['columns'])}) "
+                     f"to {finding['references']} has no index")
+    for finding in report["wide_keys"]:
+        lines.append(f"{finding['table']}.{finding['column']}: {finding['role']} column of wide type {finding['type']}")
+    for finding in report["large_unpaginated_tables"]:
+        lines.append(f"{finding['table']}: ~{finding['estimated_rows']:,} rows, {finding['route']} without ?limit= "
+                     "streams the whole table")
+    for finding in report["unindexed_filters"]:
+        lines.append(f"{finding['table']}.{finding['column']}: opted-in filter without an index")
+    for finding in report["seq_scan_hotspots"]:
+        lines.append(f"{finding['table']}: {finding['seq_scan']:,} sequential scans reading {finding['seq_tup_read']:,} "
+                     f"rows against {finding['idx_scan']:,} index scans")
+    return lines
+
+
+def write_index_report(project_name: str, report: Dict) -> Tuple[str, List[str]]:
+    """Writes projects/<name>/index_report.json and returns its path with the summary lines."""
+    path = f"projects/{project_name}/{REPORT_FILENAME}"
+    write_file(path, json.dumps(report, indent=2) + "\n")
+    return path, summarize_index_report(report)
@@ -1,32 +1,208 @@
 import os
 import logging
-import shutil
-import psycopg2
-from core.db_connector import DatabaseConnector
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from core.db_info_manager import get_db_config_path, save_db_info
-from core.structure_generator import create_run_py, generate_api_structure_for_table, generate_model_for_database
+from core.schema_introspector import introspect_schema, resolve_schemas, select_schemas
+from core.schema_model import DEFAULT_SCHEMA
+from core.schema_snapshot import build_snapshot, read_snapshot, save_snapshot
+from core.export_registry import ExportRegistry
+from core.index_advisor import build_index_report, collect_table_stats, merge_index_reports, write_index_report
+from core.generation_manifest import MANIFEST_FILENAME, load_manifest, plan_regeneration, save_manifest, schema_fingerprints, templates_fingerprint
+from core.structure_generator import (API_CATEGORIES, api_jobs, create_run_py, model_jobs, output_name_for,
+                                      register_model_groups, register_table_exports, remove_empty_namespaces,
+                                      remove_table_outputs, run_render_jobs, static_file_target, table_outputs_exist)
+from utils import create_directory, read_file, render_template, shared_renderer, write_file
+from utils.output_writer import OutputWriter
+from utils.profiler import Profiler
 
 logging.basicConfig(level=logging.INFO)
 
+# Connection pool settings written into the generated config.py, each overridable there through the environment
+POOL_DEFAULTS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "statement_timeout_ms": 30000
+}
+
+# SQLAlchemy driver of the generated app per template type
+DATABASE_DRIVERS = {
+    "default": "psycopg2",
+    "async": "asyncpg"
+}
+
+# Response cache settings of the generated app, a ttl of 0 disables it
+CACHE_DEFAULTS = {
+    "ttl": 60,
+    "size": 1024
+}
+
+# Instrumentation settings of the generated app when metrics are enabled, a threshold of 0 disables the slow query log
+METRICS_DEFAULTS = {
+    "slow_query_ms": 200
+}
+
+# Count strategy of the generated list endpoints: exact below exact_rows estimated rows, large_tables from there on
+COUNT_DEFAULTS = {
+    "exact_rows": 100_000,
+    "large_tables": "estimate",
+    "cache_ttl": 60
+}
+
+PROFILE_FILENAME = "profile.json"
+
+# Directories of the template tree that are not part of a project
+SKIPPED_TEMPLATE_DIRECTORIES = {"__pycache__"}
+
+# Connections introspecting schemas side by side
+INTROSPECT_CONNECTIONS = 8
+
 class ProjectManager:
 
-    def __init__(self):
-        self.db_info = {}
+    def __init__(self, template_cache_path: str = None, workers: int = 1, executor: str = "process",
+                 incremental: bool = True, replicas: list = None, pool_options: dict = None,
+                 cache_options: dict = None, template_type: str = "default", filter_opt_in: dict = None,
+                 metrics: bool = False, metrics_options: dict = None, profile: bool = False,
+                 cprofile_path: str = None, snapshot_path: str = None, snapshot_output: str = None,
+                 schema_include: list = None, schema_exclude: list = None,
+                 introspect_connections: int = INTROSPECT_CONNECTIONS, lazy: bool = False,
+                 project_name: str = None, db_info: dict = None, interactive: bool = True,
+                 count_options: dict = None):
+        # Given ones are used instead of prompting for them
+        self.project_name = project_name
+        self.db_info = dict(db_info or {})
+        # Without a user to prompt, a missing or failing database configuration fails the run
+        self.interactive = interactive
         self.generation_options = {}
         self.template_path = "templates"
+        self.template_cache_path = template_cache_path
+        self.workers = workers
+        self.executor = executor
+        self.incremental = incremental
+        self.replicas = replicas or []
+        self.pool_options = pool_options or {}
+        self.cache_options = cache_options or {}
+        self.template_type = template_type
+        self.filter_opt_in = filter_opt_in or {}
+        self.metrics = metrics
+        self.metrics_options = metrics_options or {}
+        self.count_options = count_options or {}
+        # A cProfile dump implies the phase report
+        self.profiler = Profiler(cprofile_path) if profile or cprofile_path else None
+        # Generate from a snapshot instead of the database, or capture one and stop
+        self.snapshot_path = snapshot_path
+        self.snapshot_output = snapshot_output
+        # Schema names or patterns; the database's default schema only when none are given
+        self.schema_include = schema_include or []
+        self.schema_exclude = schema_exclude or []
+        self.introspect_connections = introspect_connections
+        self.schemas = []
+        # Scan counters of the index advisor by schema, then by table
+        self.table_stats = {}
+        # Writer of the last generation, whose report() counts the files written and skipped
+        self.output = None
+        # Register routes from a table and export package symbols on demand, importing controllers and models when first used
+        self.lazy = lazy
 
     def run(self):
-        self.setup_project()
-        self.configure_database()
-        self.setup_project_structure()
-        generate_model_for_database(self.db_info, self.project_name)
-        self.create_csr()
-        create_run_py(self.project_name)
+        if self.profiler is None:
+            self.run_phases()
+            return
+        with self.profiler.session():
+            self.run_phases()
+        path = os.path.join(self.project_path, PROFILE_FILENAME)
+        self.profiler.write(path)
+        logging.info(f"Profile written to {path}" + (f", cProfile stats to {self.profiler.cprofile_path}"
+                                                       if self.profiler.cprofile_path else ""))
+
+    def run_phases(self):
+        if self.snapshot_output:
+            with self.phase("setup_project"):
+                self.setup_project()
+            with self.phase("configure_database"):
+                self.configure_database()
+            with self.phase("introspect_database"):
+                self.introspect_database()
+            with self.phase("save_snapshot"):
+                self.write_snapshot()
+            return
+
+        with self.phase("configure_renderer"):
+            shared_renderer(self.template_path, self.template_cache_path)
+        with self.phase("setup_project"):
+            self.setup_project()
+        with self.phase("configure_database"):
+            self.configure_database()
+        # Nothing reaches the project directory before the whole project is generated
+        # app/ is swapped in as one tree, the manifest last so that an interrupted commit is regenerated next time
+        self.output = OutputWriter(self.project_path, swapped=["app"], last=[MANIFEST_FILENAME])
+        with self.output.session():
+            with self.phase("setup_project_structure"):
+                self.setup_project_structure()
+            with self.phase("introspect_database"):
+                self.introspect_database()
+            self.generate_code()
+
+    def phase(self, name: str):
+        """Profiles the enclosed step as one phase when profiling is enabled."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    def generate_code(self):
+        """Generate the code of every table that changed since the last run and drop the code of removed tables."""
+        with self.phase("plan_regeneration"):
+            fingerprints = {}
+            for schema in self.schemas:
+                fingerprints.update(schema_fingerprints(schema, {**COUNT_DEFAULTS, **self.count_options}))
+            templates_hash = templates_fingerprint(self.template_path, {"template_type": self.template_type,
+                                                                       "filter_opt_in": self.filter_opt_in})
+            # Loaded by full runs as well, which need it to find the tables dropped since
+            previous = load_manifest(self.project_name)
+            changed, dropped = plan_regeneration(previous, templates_hash, fingerprints, full=not self.incremental)
+
+            for table_name in dropped:
+                remove_table_outputs(table_name, self.project_name)
+            if dropped:
+                remove_empty_namespaces(self.project_name)
+
+            # Files deleted by hand are regenerated even if the table itself is unchanged
+            changed = set(changed)
+            tables = {schema.name: [table for table in schema.mappable_tables()
+                                    if output_name_for(table) in changed
+                                    or not table_outputs_exist(output_name_for(table), self.project_name)]
+                      for schema in self.schemas}
+        logging.info(f"Regenerating {sum(map(len, tables.values()))} of {len(fingerprints)} tables in "
+                     f"{len(self.schemas)} schema(s), removing {len(dropped)} dropped tables.")
+
+        with self.phase("generate_models"):
+            self.generate_models(tables)
+        with self.phase("create_csr"):
+            self.create_csr(tables)
+        with self.phase("write_package_exports"):
+            self.write_package_exports()
+        with self.phase("create_run_py"):
+            create_run_py(self.project_name, self.template_type, self.metrics, self.lazy, self.schemas)
+        with self.phase("save_manifest"):
+            save_manifest(self.project_name, templates_hash, fingerprints)
+        with self.phase("report_indexes"):
+            self.report_indexes()
+
+    def report_indexes(self):
+        """Write the index advisor report of the generated API and log its summary."""
+        report = merge_index_reports([build_index_report(schema, self.table_stats.get(schema.name), self.filter_opt_in)
+                                      for schema in self.schemas])
+        path, summary = write_index_report(self.project_name, report)
+        logging.info(f"Index report written to {path}: {len(summary)} finding(s), "
+                     f"{len(report['suggested_indexes'])} suggested index(es).")
+        for line in summary:
+            logging.info(f"  {line}")
 
     def setup_project(self):
         """Setup the project based on user input."""
-        from core.user_interactions import get_project_name
-        self.project_name = get_project_name()
+        if not self.project_name:
+            from core.user_interactions import get_project_name
+            self.project_name = get_project_name()
         self.project_path = os.path.join("projects", self.project_name )
         self.config_path = get_db_config_path(self.project_name)
 
@@ -37,12 +213,34 @@ class ProjectManager:
     def configure_database(self):
         """Configure the database based on user input. Keep prompting until validation is successful."""
         from core import load_db_info
-        if not self.is_new_project and os.path.exists(self.config_path):
+        if not self.db_info and not self.is_new_project and os.path.exists(self.config_path):
             logging.info("Loading existing database configuration...")
             self.db_info = load_db_info(self.project_name)
-        
+
+        if self.snapshot_path:
+            self.load_snapshot()
+            return
+        if not self.interactive:
+            if not self.db_info:
+                raise ValueError(f"No database configuration given or saved for project {self.project_name}")
+            if not self.validate_db_connection():
+                raise ConnectionError(f"Cannot connect to database {self.db_info.get('db_name')} of project {self.project_name}")
+            return
         self.prompt_until_successful_connection()
 
+    def load_snapshot(self):
+        """Read the schema from the snapshot; the database is never contacted."""
+        self.schemas, self.table_stats, connection = read_snapshot(self.snapshot_path)
+        if self.schema_include or self.schema_exclude:
+            selected = select_schemas([schema.name for schema in self.schemas], self.schema_include or ["*"],
+                                      self.schema_exclude)
+            self.schemas = [schema for schema in self.schemas if schema.name in selected]
+        logging.info(f"Loaded {sum(len(schema.tables) for schema in self.schemas)} tables in {len(self.schemas)} "
+                     f"schema(s) from snapshot {self.snapshot_path}")
+        if not self.db_info:
+            # The generated config.py falls back to these; DATABASE_URL supplies the password at runtime
+            self.db_info = {**connection, "db_password": ""}
+
     def prompt_until_successful_connection(self):
         from core.user_interactions import get_db_details
         """Keep prompting the user for db info until a successful connection is made."""
@@ -59,6 +257,7 @@ class ProjectManager:
                     self.db_info = ""
 
     def validate_db_connection(self):
+        import psycopg2
         try:
             conn = psycopg2.connect(
                 host=self.db_info["db_host"],
@@ -89,62 +288,137 @@ class ProjectManager:
         # ... logic to generate the required components ...
 
     def check_and_create_project_folder(self):
-        if not os.path.exists(self.project_path):
-            os.makedirs(self.project_path)
+        if create_directory(self.project_path):
             logging.info(f"Project directory '{self.project_path}' created.")
 
+    def walk_templates(self):
+        """os.walk over the template tree, leaving out the directories that are not part of a project."""
+        for root, dirs, files in os.walk(self.template_path):
+            dirs[:] = sorted(directory for directory in dirs if directory not in SKIPPED_TEMPLATE_DIRECTORIES)
+            yield root, dirs, files
+
     def load_template_structure(self) -> dict:
         structure = {}
-        for root, dirs, _ in os.walk(self.template_path):
+        for root, dirs, _ in self.walk_templates():
             relative_root = os.path.relpath(root, self.template_path)
-            structure[relative_root] = dirs
+            structure[relative_root] = list(dirs)
         return structure
 
     def create_missing_directories(self, template_structure: dict):
+        # Inside the output session the directories are created along with the files, when it commits
         for relative_root, dirs in template_structure.items():
             for directory in dirs:
                 full_path = os.path.join(self.project_path, relative_root, directory)
-                if not os.path.exists(full_path):
-                    os.makedirs(full_path)
+                if create_directory(full_path):
                     logging.info(f"Created missing directory: {full_path}")
 
-
     def copy_template_files(self):
-        for root, _, files in os.walk(self.template_path):
+        for root, _, files in self.walk_templates():
             relative_root = os.path.relpath(root, self.template_path)
             target_dir = os.path.join(self.project_path, relative_root)
             for file in files:
-                if file.endswith(".py"):
-                    shutil.copy2(os.path.join(root, file), target_dir)
+                target = static_file_target(file, self.template_type)
+                if not file.endswith(".py") or target is None:
+                    continue
+                # A variant replaces the default file of the same name, which is then not copied at all
+                if target == file and self.template_type != "default" and f"{self.template_type}_{file}" in files:
+                    continue
+                if write_file(os.path.join(target_dir, target), read_file(os.path.join(root, file))):
                     logging.info(f"Copied {file} to {target_dir}")
 
     def create_config_file(self):
-        config_content = """
-import os
-
-class Config:
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'postgresql://{username}:{password}@{host}:{port}/{dbname}'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-        """.format(
-            username=self.db_info["db_username"],
-            password=self.db_info["db_password"],
+        """Write app/config.py: the primary's URL, the pool settings, the read replicas' URLs, the response cache and metrics settings."""
+        credentials = "{username}:{password}@".format(username=self.db_info["db_username"],
+                                                      password=self.db_info["db_password"])
+        driver = DATABASE_DRIVERS[self.template_type]
+        database_url = "postgresql+{driver}://{credentials}{host}:{port}/{dbname}".format(
+            driver=driver,
+            credentials=credentials,
             host=self.db_info["db_host"],
             port=self.db_info["db_port"],
             dbname=self.db_info["db_name"]
         )
-        
+        # Replicas are given as host[:port] and share the primary's credentials and database name
+        replica_urls = ["postgresql+{driver}://{credentials}{host}:{port}/{dbname}".format(
+            driver=driver,
+            credentials=credentials,
+            host=replica.partition(":")[0],
+            port=replica.partition(":")[2] or self.db_info["db_port"],
+            dbname=self.db_info["db_name"]
+        ) for replica in self.replicas]
+
+        config_content = render_template("config_py.j2", {
+            "database_url": database_url,
+            "replica_urls": replica_urls,
+            "pool": {**POOL_DEFAULTS, **self.pool_options},
+            "cache": {**CACHE_DEFAULTS, **self.cache_options},
+            "metrics": {**METRICS_DEFAULTS, **self.metrics_options} if self.metrics else None,
+            "count": {**COUNT_DEFAULTS, **self.count_options},
+            "template_type": self.template_type,
+            "lazy": self.lazy
+        })
         config_path = os.path.join(self.project_path, "app", "config.py")
-        with open(config_path, "w") as config_file:
-            config_file.write(config_content)
-        logging.info(f"Created config.py inside {self.project_path}/app/")
+        if write_file(config_path, config_content):
+            logging.info(f"Created config.py inside {self.project_path}/app/")
 
-    def create_csr(self): # Creates controllers, services and repositories
-        connector = DatabaseConnector(self.db_info)
+    def introspect_database(self):
+        """Introspect the database once; every generated layer is built from the resulting schema model."""
+        if self.snapshot_path:
+            # Already loaded by configure_database
+            return
+        # Imported here so that generating from a snapshot never loads psycopg2
+        from core.db_connector import ConnectorPool
 
-        tables_query = (
-            "SELECT table_name FROM information_schema.tables WHERE table_schema='public';"
-        )
-        available_tables = [row[0] for row in connector.execute_query(tables_query)]
+        def introspect(schema_name):
+            connector = pool.connector()
+            return introspect_schema(connector, schema_name), collect_table_stats(connector, schema_name)
+
+        # Each schema is read over its own connection, so the slowest schema sets the pace rather than their sum
+        with ConnectorPool(self.db_info) as pool, \
+                ThreadPoolExecutor(max_workers=max(1, self.introspect_connections)) as executor:
+            # Resolving the patterns on a worker lets its connection serve a schema afterwards
+            schema_names = executor.submit(lambda: resolve_schemas(pool.connector(), self.schema_include or [DEFAULT_SCHEMA],
+                                                                   self.schema_exclude)).result()
+            results = list(executor.map(introspect, schema_names))
+        self.schemas = [schema for schema, _ in results]
+        self.table_stats = {schema.name: stats for schema, stats in results}
+
+        for schema in self.schemas:
+            for table in schema.tables.values():
+                if not table.primary_key:
+                    logging.warning(f"Table {table.qualified_name} has no primary key and will be skipped.")
+
+    def write_snapshot(self):
+        """Save the introspected schema so that later runs can generate from it with --snapshot."""
+        snapshot = build_snapshot(self.schemas, self.table_stats, db_info=self.db_info)
+        if save_snapshot(self.snapshot_output, snapshot):
+            logging.info(f"Schema snapshot of {sum(len(schema.tables) for schema in self.schemas)} tables in "
+                         f"{len(self.schemas)} schema(s) written to {self.snapshot_output}")
+        else:
+            logging.info(f"Schema snapshot {self.snapshot_output} is up to date")
+
+    def write_package_exports(self):
+        """Write every package __init__.py once, covering all tables including the unchanged ones."""
+        registry = ExportRegistry(lazy=self.lazy)
+        for schema in self.schemas:
+            for table in schema.mappable_tables():
+                register_table_exports(registry, table)
+            if self.lazy:
+                register_model_groups(registry, schema)
+        registry.write(self.project_name)
+
+    def generate_models(self, tables=None):
+        """Render the models of the given tables by schema name, every mappable table by default, on one worker pool."""
+        tables = tables or {}
+        jobs = [job for schema in self.schemas for job in model_jobs(schema, self.project_name, tables.get(schema.name))]
+        logging.info(f"Generating models for {len(jobs)} tables in project {self.project_name}")
+        run_render_jobs(jobs, self.workers, self.executor)
 
-        for table_name in available_tables:
-            generate_api_structure_for_table(self.db_info, table_name, self.project_name)
+    def create_csr(self, tables=None): # Creates controllers, services and repositories
+        tables = tables or {}
+        jobs = [job for schema in self.schemas
+                for job in api_jobs(schema, self.project_name, tables.get(schema.name), self.template_type,
+                                    self.filter_opt_in, {**COUNT_DEFAULTS, **self.count_options})]
+        logging.info(f"Generating API structure for {len(jobs) // len(API_CATEGORIES)} tables in project {self.project_name} "
+                     f"with {self.workers} worker(s)")
+        run_render_jobs(jobs, self.workers, self.executor)
@@ -0,0 +1,234 @@
+import re
+import logging
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Tuple
+from core.schema_model import Column, ForeignKey, Index, Schema, Table, qualified_type_name
+
+# ============================
+# Catalog Queries
+# ============================
+# Each query pulls one kind of object for the whole schema at once, so the
+# number of round trips does not grow with the number of tables.
+
+SCHEMAS_QUERY = """
+SELECT n.nspname
+FROM pg_catalog.pg_namespace n
+WHERE n.nspname !~ '^pg_' AND n.nspname <> 'information_schema'
+ORDER BY n.nspname;
+"""
+
+TABLES_QUERY = """
+SELECT c.oid, c.relname, c.reltuples::bigint
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+ORDER BY c.relname;
+"""
+
+COLUMNS_QUERY = """
+SELECT a.attrelid, a.attname,
+       pg_catalog.format_type(a.atttypid, a.atttypmod),
+       t.typtype, t.typcategory, t.typname, tn.nspname,
+       pg_catalog.format_type(t.typelem, NULL),
+       NOT a.attnotnull,
+       pg_catalog.pg_get_expr(d.adbin, d.adrelid),
+       a.attidentity <> ''
+FROM pg_catalog.pg_attribute a
+JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+JOIN pg_catalog.pg_namespace tn ON tn.oid = t.typnamespace
+LEFT JOIN pg_catalog.pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+WHERE n.nspname = %s AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+  AND a.attnum > 0 AND NOT a.attisdropped
+ORDER BY a.attrelid, a.attnum;
+"""
+
+CONSTRAINTS_QUERY = """
+SELECT con.conrelid, con.conname, con.contype,
+       ARRAY(SELECT a.attname::text
+             FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+             JOIN pg_catalog.pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+             ORDER BY k.ord),
+       fn.nspname, fc.relname,
+       ARRAY(SELECT a.attname::text
+             FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, ord)
+             JOIN pg_catalog.pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+             ORDER BY k.ord)
+FROM pg_catalog.pg_constraint con
+JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_class fc ON fc.oid = con.confrelid
+LEFT JOIN pg_catalog.pg_namespace fn ON fn.oid = fc.relnamespace
+WHERE n.nspname = %s AND con.contype IN ('p', 'u', 'f')
+ORDER BY con.conrelid, con.conname;
+"""
+
+INDEXES_QUERY = """
+SELECT i.indrelid, ic.relname, i.indisunique, i.indisprimary, am.amname, i.indpred IS NOT NULL,
+       ARRAY(SELECT a.attname::text
+             FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+             LEFT JOIN pg_catalog.pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+             WHERE k.ord <= i.indnkeyatts
+             ORDER BY k.ord)
+FROM pg_catalog.pg_index i
+JOIN pg_catalog.pg_class ic ON ic.oid = i.indexrelid
+JOIN pg_catalog.pg_class c ON c.oid = i.indrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_catalog.pg_am am ON am.oid = ic.relam
+WHERE n.nspname = %s AND c.relkind IN ('r', 'p') AND NOT c.relispartition AND i.indisvalid
+ORDER BY i.indrelid, ic.relname;
+"""
+
+# Enum types of the schema, and the ones of other schemas that its columns use
+ENUMS_QUERY = """
+SELECT n.nspname, t.typname, e.enumlabel
+FROM pg_catalog.pg_enum e
+JOIN pg_catalog.pg_type t ON t.oid = e.enumtypid
+JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace
+WHERE n.nspname = %s
+   OR t.oid IN (SELECT a.atttypid
+                FROM pg_catalog.pg_attribute a
+                JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+                JOIN pg_catalog.pg_namespace cn ON cn.oid = c.relnamespace
+                WHERE cn.nspname = %s AND c.relkind IN ('r', 'p') AND a.attnum > 0 AND NOT a.attisdropped)
+ORDER BY n.nspname, t.typname, e.enumsortorder;
+"""
+
+# ============================
+# Row Conversion
+# ============================
+
+TYPE_MODIFIER_PATTERN = re.compile(r'\(\d+(,\d+)?\)')
+LENGTH_PATTERN = re.compile(r'^(character varying|character)\((\d+)\)$')
+
+
+def normalize_data_type(formatted_type: str) -> str:
+    """Turns format_type() output such as 'character varying(64)' into 'character varying'."""
+    return TYPE_MODIFIER_PATTERN.sub('', formatted_type).strip()
+
+
+def build_column(row: Tuple) -> Column:
+    (_, name, formatted_type, typtype, typcategory, typname, type_schema, element_type,
+     is_nullable, default, is_identity) = row
+    length_match = LENGTH_PATTERN.match(formatted_type)
+    column = Column(
+        name=name,
+        data_type=normalize_data_type(formatted_type),
+        is_nullable=is_nullable,
+        default=default,
+        length=int(length_match.group(2)) if length_match else None,
+        is_identity=is_identity,
+    )
+    if typtype == 'e':
+        column.data_type = 'USER-DEFINED'
+        column.enum_type = qualified_type_name(type_schema, typname)
+    elif typcategory == 'A':
+        column.data_type = 'ARRAY'
+        column.element_type = normalize_data_type(element_type)
+    return column
+
+
+def build_schema(schema_name: str, table_rows: Iterable[Tuple], column_rows: Iterable[Tuple],
+                 constraint_rows: Iterable[Tuple], enum_rows: Iterable[Tuple],
+                 index_rows: Iterable[Tuple] = ()) -> Schema:
+    """
+    Assembles the schema model from raw catalog rows.
+
+    Args:
+    - schema_name (str): Name of the introspected PostgreSQL schema.
+    - table_rows, column_rows, constraint_rows, enum_rows, index_rows: Result rows of the catalog queries above.
+
+    Returns:
+    - Schema: Tables, columns, keys, indexes and enum types of the schema.
+    """
+    schema = Schema(name=schema_name)
+    tables_by_oid: Dict[int, Table] = {}
+
+    for oid, name, estimated_rows in table_rows:
+        table = Table(name=name, schema=schema_name, estimated_rows=max(estimated_rows or 0, 0))
+        tables_by_oid[oid] = table
+        schema.tables[name] = table
+
+    for row in column_rows:
+        table = tables_by_oid.get(row[0])
+        if table:
+            table.columns.append(build_column(row))
+
+    for oid, name, contype, columns, referred_schema, referred_table, referred_columns in constraint_rows:
+        table = tables_by_oid.get(oid)
+        if not table:
+            continue
+        if contype == 'p':
+            table.primary_key = list(columns)
+        elif contype == 'u':
+            table.unique_constraints.append(list(columns))
+        elif contype == 'f':
+            table.foreign_keys.append(ForeignKey(
+                name=name,
+                columns=list(columns),
+                referred_schema=referred_schema,
+                referred_table=referred_table,
+                referred_columns=list(referred_columns),
+            ))
+
+    for oid, name, is_unique, is_primary, method, is_partial, columns in index_rows:
+        table = tables_by_oid.get(oid)
+        if table:
+            # Expression keys have no attribute, the LEFT JOIN leaves them NULL
+            table.indexes.append(Index(name=name, columns=list(columns), is_unique=is_unique,
+                                       is_primary=is_primary, method=method, is_partial=is_partial))
+
+    for enum_schema, enum_name, label in enum_rows:
+        schema.enums.setdefault(qualified_type_name(enum_schema, enum_name), []).append(label)
+
+    return schema
+
+# ============================
+# Introspection
+# ============================
+
+WILDCARDS = set("*?[")
+
+
+def select_schemas(names: Iterable[str], include: List[str], exclude: List[str] = ()) -> List[str]:
+    """The schema names matching an include pattern and no exclude pattern, both with shell-style wildcards."""
+    return [name for name in names
+            if any(fnmatchcase(name, pattern) for pattern in include)
+            and not any(fnmatchcase(name, pattern) for pattern in exclude)]
+
+
+def resolve_schemas(connector, include: List[str], exclude: List[str] = ()) -> List[str]:
+    """
+    Names of the schemas to introspect.
+
+    Plain names are taken as they are, without a round trip; wildcards and exclusions
+    are matched against the schemas of the database.
+    """
+    if not exclude and not any(WILDCARDS & set(pattern) for pattern in include):
+        return sorted(set(include))
+    return select_schemas([row[0] for row in connector.execute_query(SCHEMAS_QUERY)], include, exclude)
+
+
+def introspect_schema(connector, schema_name: str = "public") -> Schema:
+    """
+    Reads tables, columns, primary/unique/foreign keys, indexes, defaults and enum types from pg_catalog.
+
+    Args:
+    - connector (DatabaseConnector): Open connection to the database.
+    - schema_name (str): Name of the PostgreSQL schema to introspect.
+
+    Returns:
+    - Schema: The introspected schema model.
+    """
+    logging.info(f"Introspecting schema '{schema_name}'")
+    schema = build_schema(
+        schema_name,
+        connector.execute_query(TABLES_QUERY, (schema_name,)),
+        connector.execute_query(COLUMNS_QUERY, (schema_name,)),
+        connector.execute_query(CONSTRAINTS_QUERY, (schema_name,)),
+        connector.execute_query(ENUMS_QUERY, (schema_name, schema_name)),
+        connector.execute_query(INDEXES_QUERY, (schema_name,)),
+    )
+    logging.info(f"Found {len(schema.tables)} tables in schema '{schema_name}'")
+    return schema
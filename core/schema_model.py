@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SCHEMA = "public"
+
+
+def qualified_type_name(schema: str, name: str) -> str:
+    """A type name, prefixed with its schema outside of the default one, as enum types are keyed."""
+    return name if schema == DEFAULT_SCHEMA else f"{schema}.{name}"
+
+
+def split_type_name(qualified_name: str) -> Tuple[str, str]:
+    """The schema and bare name of a type named by qualified_type_name."""
+    schema, _, name = qualified_name.rpartition(".")
+    return schema or DEFAULT_SCHEMA, name
+
+
+@dataclass
+class Column:
+    name: str
+    data_type: str  # information_schema style, e.g. 'character varying', 'ARRAY', 'USER-DEFINED'
+    is_nullable: bool = True
+    default: Optional[str] = None
+    length: Optional[int] = None
+    enum_type: Optional[str] = None  # qualified_type_name of the enum type
+    element_type: Optional[str] = None  # element type of ARRAY columns
+    is_identity: bool = False
+
+
+@dataclass
+class ForeignKey:
+    name: str
+    columns: List[str]
+    referred_schema: str
+    referred_table: str
+    referred_columns: List[str]
+
+
+@dataclass
+class Index:
+    name: str
+    columns: List[Optional[str]]  # key columns in index order, None for expression keys
+    is_unique: bool = False
+    is_primary: bool = False
+    method: str = "btree"
+    is_partial: bool = False
+
+    @property
+    def leading_column(self) -> Optional[str]:
+        """The first key column, None when the index starts with an expression."""
+        return self.columns[0] if self.columns else None
+
+
+@dataclass
+class Table:
+    name: str
+    schema: str = DEFAULT_SCHEMA
+    columns: List[Column] = field(default_factory=list)
+    primary_key: List[str] = field(default_factory=list)
+    foreign_keys: List[ForeignKey] = field(default_factory=list)
+    unique_constraints: List[List[str]] = field(default_factory=list)
+    indexes: List[Index] = field(default_factory=list)
+    estimated_rows: int = 0
+
+    @property
+    def qualified_name(self) -> str:
+        """The table name, prefixed with its schema outside of the default one."""
+        return self.name if self.schema == DEFAULT_SCHEMA else f"{self.schema}.{self.name}"
+
+    def column(self, name: str) -> Optional[Column]:
+        for column in self.columns:
+            if column.name == name:
+                return column
+        return None
+
+
+@dataclass
+class Schema:
+    tables: Dict[str, Table] = field(default_factory=dict)
+    enums: Dict[str, List[str]] = field(default_factory=dict)  # labels by qualified_type_name
+    name: str = DEFAULT_SCHEMA
+
+    # Incoming foreign keys by referred table, built on first use: the schema is not changed once introspected
+    _referencing: Optional[Dict[Tuple[str, str], List[Tuple[Table, ForeignKey]]]] = field(
+        default=None, init=False, repr=False, compare=False)
+
+    def mappable_tables(self) -> List[Table]:
+        """Tables the ORM can map, i.e. the ones that have a primary key."""
+        return [table for table in self.tables.values() if table.primary_key]
+
+    def referencing(self, table: Table) -> List[Tuple[Table, ForeignKey]]:
+        """The foreign keys of mappable tables in the same schema that point at the table, with their tables."""
+        if self._referencing is None:
+            self._referencing = {}
+            for other in self.mappable_tables():
+                for fk in other.foreign_keys:
+                    if fk.referred_schema == other.schema:
+                        self._referencing.setdefault((fk.referred_schema, fk.referred_table), []).append((other, fk))
+        return self._referencing.get((table.schema, table.name), [])
@@ -0,0 +1,97 @@
+import json
+from dataclasses import MISSING, asdict, fields
+from typing import Dict, List, Tuple
+from core.schema_model import Column, ForeignKey, Index, Schema, Table
+from utils.file_manager import path_exists, read_file, write_file
+
+SNAPSHOT_VERSION = 3
+
+# Connection details kept in a snapshot; the password never is
+CONNECTION_FIELDS = ("db_host", "db_port", "db_name", "db_username")
+
+
+def compact(instance) -> Dict:
+    """The fields of a dataclass instance that differ from their defaults, which keeps snapshots small."""
+    values = asdict(instance)
+    return {item.name: values[item.name] for item in fields(instance)
+            if item.default is MISSING or values[item.name] != item.default}
+
+
+def snapshot_table(table: Table) -> Dict:
+    return {
+        "schema": table.schema,
+        "estimated_rows": table.estimated_rows,
+        "columns": [compact(column) for column in table.columns],
+        "primary_key": table.primary_key,
+        "unique_constraints": table.unique_constraints,
+        "foreign_keys": [asdict(fk) for fk in table.foreign_keys],
+        "indexes": [compact(index) for index in table.indexes],
+    }
+
+
+def build_snapshot(schemas: List[Schema], table_stats: Dict[str, Dict[str, Dict[str, int]]],
+                   db_info: Dict[str, str] = None) -> Dict:
+    """
+    Everything generation reads from the database, as plain JSON-serializable data.
+
+    Schemas, tables and enum types are keyed by name and sorted, columns keep their
+    ordinal order, so two snapshots of the same database compare equal and diff line by line.
+
+    Args:
+    - schemas (List[Schema]): The introspected schemas.
+    - table_stats (Dict): Scan counters of the index advisor by schema, then by table.
+    - db_info (Dict): Connection details, of which everything but the password is kept.
+    """
+    return {
+        "version": SNAPSHOT_VERSION,
+        "connection": {key: (db_info or {}).get(key) for key in CONNECTION_FIELDS},
+        "schemas": {schema.name: {
+            "enums": dict(sorted(schema.enums.items())),
+            "tables": {name: snapshot_table(table) for name, table in sorted(schema.tables.items())},
+            "table_stats": dict(sorted(table_stats.get(schema.name, {}).items())),
+        } for schema in sorted(schemas, key=lambda schema: schema.name)},
+    }
+
+
+def schema_from_snapshot(schema_name: str, snapshot: Dict) -> Schema:
+    schema = Schema(enums={name: list(labels) for name, labels in snapshot["enums"].items()}, name=schema_name)
+    for name, table in snapshot["tables"].items():
+        schema.tables[name] = Table(
+            name=name,
+            schema=table["schema"],
+            columns=[Column(**column) for column in table["columns"]],
+            primary_key=table["primary_key"],
+            foreign_keys=[ForeignKey(**fk) for fk in table["foreign_keys"]],
+            unique_constraints=table["unique_constraints"],
+            indexes=[Index(**index) for index in table["indexes"]],
+            estimated_rows=table["estimated_rows"],
+        )
+    return schema
+
+
+def save_snapshot(path: str, snapshot: Dict) -> bool:
+    """Writes the snapshot, leaving the file untouched when the schema did not change. Returns whether it was written."""
+    return write_file(path, json.dumps(snapshot, indent=1) + "\n")
+
+
+def load_snapshot(path: str) -> Dict:
+    if not path_exists(path):
+        raise FileNotFoundError(f"Schema snapshot {path} not found!")
+    snapshot = json.loads(read_file(path))
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Schema snapshot {path} has version {snapshot.get('version')}, "
+                         f"this generator reads version {SNAPSHOT_VERSION}. Capture it again with --introspect.")
+    return snapshot
+
+
+def read_snapshot(path: str) -> Tuple[List[Schema], Dict[str, Dict[str, Dict[str, int]]], Dict[str, str]]:
+    """
+    Loads a snapshot written by save_snapshot.
+
+    Returns:
+    - Tuple: The schema models, the table statistics of the index advisor by schema and the connection details.
+    """
+    snapshot = load_snapshot(path)
+    schemas = [schema_from_snapshot(name, schema) for name, schema in snapshot["schemas"].items()]
+    table_stats = {name: schema["table_stats"] for name, schema in snapshot["schemas"].items()}
+    return schemas, table_stats, snapshot["connection"]
@@ -1,22 +1,166 @@
 import os
-from typing import Dict, List
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
 from utils import write_file, render_template
+from utils.file_manager import list_directory, path_exists, remove_directory, remove_file
+from utils.profiler import active_profiler
+from utils.template_renderer import configure_renderer, renderer_settings
+from utils.custom_filters import json_encoder_for, map_sqlalchemy_type, sqlalchemy_imports
+from core.export_registry import ExportRegistry
+from core.schema_model import DEFAULT_SCHEMA, Column, ForeignKey, Schema, Table, split_type_name
 import logging
-import subprocess
+import keyword
 import re
-from jinja2 import Template
 
 # ============================
 # Helper Functions
 # ============================
 
-def basic_context(table_name: str) -> Dict:
+def basic_context(table: Table) -> Dict:
+    namespace = namespace_for(table.schema)
     return {
-        "table_name": table_name,
-        "table_name_lower": table_name.lower()
+        "table_name": table.name,
+        "table_name_lower": table.name.lower(),
+        "class_name": model_class_for(table.name, table.schema),
+        "blueprint_name": blueprint_name_for(table),
+        # Suffix of the app packages holding the table's modules, e.g. ".tenant_a"
+        "package": f".{namespace}" if namespace else "",
+        "cache_name": table.qualified_name
+    }
+
+def namespace_for(schema_name: str) -> str:
+    """Subpackage the generated code of a schema goes to, none for the default schema."""
+    return "" if schema_name == DEFAULT_SCHEMA else attribute_name_for(schema_name)
+
+def output_name_for(table: Table) -> str:
+    """
+    Name of the table's generated modules within each app package, e.g. "players" or
+    "tenant_a/players", which also identifies the table in the manifest.
+    """
+    namespace = namespace_for(table.schema)
+    return f"{namespace}/{table.name}" if namespace else table.name
+
+def model_class_for(table_name: str, schema_name: str = DEFAULT_SCHEMA) -> str:
+    """Model class name of a table; outside of the default schema it starts with the schema, e.g. TenantAPlayers."""
+    namespace = namespace_for(schema_name)
+    return class_name_for(f"{namespace}_{table_name}" if namespace else table_name)
+
+def blueprint_name_for(table: Table) -> str:
+    namespace = namespace_for(table.schema)
+    return f"{namespace}_{table.name.lower()}" if namespace else table.name.lower()
+
+def url_prefix_for(table: Table) -> str:
+    namespace = namespace_for(table.schema)
+    return f"/{namespace}/{table.name}" if namespace else f"/{table.name}"
+
+ROUTE_CONVERTERS = {
+    "integer": "int",
+    "bigint": "int",
+    "smallint": "int",
+    "uuid": "uuid"
+}
+
+# (rule, methods, view function) of every controller, rendered into its decorators and into the lazy route table of run.py
+CONTROLLER_ROUTES = [
+    ("/", ["GET"], "get_all"),
+    ("/{key_route}", ["GET"], "get_by_id"),
+    ("/", ["POST"], "create"),
+    ("/{key_route}", ["PUT"], "update"),
+    ("/{key_route}", ["DELETE"], "delete"),
+    ("/bulk", ["POST"], "bulk_create"),
+    ("/bulk", ["PATCH"], "bulk_update"),
+    ("/bulk", ["DELETE"], "bulk_delete")
+]
+
+def key_parameters_for(table: Table) -> List[str]:
+    """Single-column keys are passed around as `id`, composite keys as a tuple of their columns."""
+    return ["id"] if len(table.primary_key) == 1 else [attribute_name_for(name) for name in table.primary_key]
+
+def key_route_for(table: Table) -> str:
+    """URL rule of the table's primary key, e.g. "<int:id>" or "<int:player_id>/<int:game_id>"."""
+    return "/".join(
+        f"<{ROUTE_CONVERTERS[table.column(name).data_type]}:{parameter}>"
+        if table.column(name).data_type in ROUTE_CONVERTERS else f"<{parameter}>"
+        for name, parameter in zip(table.primary_key, key_parameters_for(table))
+    )
+
+def controller_routes(table: Table) -> List[Tuple[str, List[str], str]]:
+    """The (rule, methods, view function) of the table's controller, in CONTROLLER_ROUTES order."""
+    key_route = key_route_for(table)
+    return [(rule.format(key_route=key_route), methods, function_name) for rule, methods, function_name in CONTROLLER_ROUTES]
+
+def linked_tables(table: Table, schema: Schema = None) -> List[str]:
+    """The table and the generated tables it references or is referenced by, whose cached responses its writes can change."""
+    linked = {table.qualified_name}
+    if schema is not None:
+        linked |= {schema.tables[fk.referred_table].qualified_name for fk in generated_foreign_keys(table, schema)}
+        linked |= {other.qualified_name for other, _ in schema.referencing(table)}
+    return sorted(linked)
+
+def filterable_columns(table: Table, opt_in: List[str] = ()) -> List[str]:
+    """
+    Columns list endpoints may filter and sort on: the leading key of a full btree index, plus any opted in.
+
+    Other columns would make the database scan the whole table, so they are only accepted
+    when explicitly opted in at generation time. Array columns are never filterable.
+    """
+    indexed = {index.leading_column for index in table.indexes
+               if index.method == "btree" and not index.is_partial and index.leading_column}
+    return [column.name for column in table.columns
+            if (column.name in indexed or column.name in opt_in) and column.data_type != "ARRAY"]
+
+# How list endpoints count a table estimated at or above the exact_rows option; smaller tables are always counted exactly
+COUNT_STRATEGIES = ["estimate", "cached", "exact"]
+
+def count_strategy_for(table: Table, count_options: Dict = None) -> str:
+    """
+    Strategy a table's list endpoint counts its rows with unless ?count= asks for another.
+
+    Tables estimated below count_options["exact_rows"] rows are counted exactly. Larger ones
+    get count_options["large_tables"], one of COUNT_STRATEGIES. Without options every table
+    is counted exactly.
+    """
+    if not count_options or table.estimated_rows < count_options["exact_rows"]:
+        return "exact"
+    return count_options["large_tables"]
+
+def api_context(table: Table, schema: Schema = None, opt_in: List[str] = (), count_strategy: str = "exact") -> Dict:
+    """
+    Context shared by the controller, repository and service templates.
+
+    Args:
+    - table (Table): The table to generate the API of.
+    - schema (Schema): The whole schema, for the tables linked to this one by foreign keys.
+    - opt_in (List[str]): Columns of the table filterable without an index backing them.
+    - count_strategy (str): How the list endpoint counts by default, see count_strategy_for.
+    """
+    unique_columns = [unique[0] for unique in table.unique_constraints
+                      if len(unique) == 1 and not table.column(unique[0]).is_nullable]
+    filterable = filterable_columns(table, opt_in)
+
+    key_parameters = key_parameters_for(table)
+    return {
+        **basic_context(table),
+        "primary_key": [attribute_name_for(name) for name in table.primary_key],
+        "primary_key_columns": table.primary_key,
+        "unique_columns": [attribute_name_for(name) for name in unique_columns],
+        "filterable_columns": filterable,
+        # Keyset pagination compares sort keys, which only works on columns without NULLs
+        "sortable_columns": [name for name in filterable if not table.column(name).is_nullable],
+        "conflict_keys": [table.primary_key] + table.unique_constraints,
+        # View function -> rule and methods of its route decorator
+        "routes": {function_name: {"rule": rule, "methods": methods}
+                   for rule, methods, function_name in controller_routes(table)},
+        "key_parameters": ", ".join(key_parameters),
+        "key_value": key_parameters[0] if len(key_parameters) == 1 else f"({', '.join(key_parameters)})",
+        "invalidated_tables": linked_tables(table, schema),
+        "schema_name": table.schema,
+        "count_strategy": count_strategy
     }
 
 def file_path_for(project_name: str, table_name: str, category: str, extension='py') -> str:
+    """Path of a generated module; table_name is the table's output name, see output_name_for."""
     category_path_mapping = {
         "model": "models",
         "controller": "controllers",
@@ -36,7 +180,25 @@ def template_name_for(category: str, template_type: str = "default") -> str:
     path_category = category_path_mapping.get(category, category)
     return f"{path_category}/{template_type}_{category}.j2"
 
-def render_and_save(category: str, table_name: str, project_name: str, context: Dict, template_type: str = "default", enum_types: List[str] = None):
+# "default" targets sync Flask with Flask-SQLAlchemy, "async" targets Quart with SQLAlchemy's asyncio extension over asyncpg
+TEMPLATE_TYPES = ["default", "async"]
+
+def static_file_target(file_name: str, template_type: str = "default") -> str:
+    """
+    Name under which a static template file is copied into a project of the given type, None if it is skipped.
+
+    Like the .j2 templates, a file prefixed with a non-default template type is that type's
+    variant: "async_extensions.py" replaces "extensions.py" in async projects and is left
+    out of every other project.
+    """
+    variant_type, _, base_name = file_name.partition("_")
+    if variant_type in TEMPLATE_TYPES and variant_type != "default":
+        return base_name if variant_type == template_type else None
+    return file_name
+
+def render_file(category: str, table_name: str, project_name: str, context: Dict, template_type: str = "default",
+                enum_types: List[str] = None) -> Tuple[str, str, float]:
+    """Renders one generated file without writing it, returning its path, its content and the time taken."""
     template_name = template_name_for(category, template_type)
     path = file_path_for(project_name, table_name, category)
 
@@ -44,268 +206,481 @@ def render_and_save(category: str, table_name: str, project_name: str, context:
     if enum_types:
         context['enums'] = enum_types
 
+    started = time.perf_counter()
     rendered_content = render_template(template_name, context)
-    write_file(path, rendered_content)
-    logging.debug(f"{category.capitalize()} for table {table_name} saved at {path}")
-
-def update_init_file(project_name: str, directory_name: str, item_name: str, import_pattern: str):
-    """
-    Updates the __init__.py file in the given directory with an import based on the provided pattern.
+    return path, rendered_content, time.perf_counter() - started
+
+def save_rendered(table_name: str, path: str, content: str) -> Tuple[int, bool]:
+    """Writes a rendered file, returning the bytes written and whether it changed."""
+    written = write_file(path, content)
+    logging.debug(f"File for table {table_name} saved at {path}")
+    return len(content.encode("utf-8")) if written else 0, written
+
+TABLE_EXPORTS = {
+    "model": ("models", "{table_name}_model", "{class_name}"),
+    "controller": ("controllers", "{table_name}_controller", "{blueprint_name}_bp"),
+    "repository": ("repositories", "{table_name}_repository", "{class_name}Repository"),
+    "service": ("services", "{table_name}_service", "{class_name}Service")
+}
+
+def register_table_exports(registry: ExportRegistry, table: Table, categories: List[str] = None):
+    """Registers the symbols the generated files of a table export in their package __init__.py."""
+    names = {"table_name": table.name, "class_name": model_class_for(table.name, table.schema),
+             "blueprint_name": blueprint_name_for(table)}
+    namespace = namespace_for(table.schema)
+    for category in categories or TABLE_EXPORTS:
+        directory_name, module_pattern, symbol_pattern = TABLE_EXPORTS[category]
+        if namespace:
+            directory_name = f"{directory_name}/{namespace}"
+        registry.register(directory_name, module_pattern.format(**names), symbol_pattern.format(**names))
+
+def model_groups(schema: Schema) -> List[List[str]]:
     """
-    # Convert table_name (like tournament_rankings) to ClassName (like TournamentRankings)
-    class_name = ''.join(word.capitalize() for word in item_name.split('_'))
-    
-    init_path = f"projects/{project_name}/app/{directory_name}/__init__.py"
-    if directory_name == "controllers":
-        new_import = import_pattern.format(item_name, item_name)
-    else:
-        new_import = import_pattern.format(item_name.lower(), class_name)
+    Tables whose models have to be imported together, sorted, leaving out the ones that stand alone.
 
-    # If the file doesn't exist, create it
-    if not os.path.exists(init_path):
-        with open(init_path, 'w') as f:
-            f.write(f"# Auto-generated __init__.py for {directory_name}\n")
+    A relationship names its target class as a string that SQLAlchemy resolves when it
+    configures the mappers, so every model linked to a loaded one by a chain of foreign
+    keys has to be loaded as well: the groups are the connected components of the foreign
+    keys between generated models.
+    """
+    parents = {table.name: table.name for table in schema.mappable_tables()}
+
+    def root(name):
+        while parents[name] != name:
+            parents[name] = parents[parents[name]]
+            name = parents[name]
+        return name
+
+    for table in schema.mappable_tables():
+        for fk in generated_foreign_keys(table, schema):
+            parents[root(table.name)] = root(fk.referred_table)
+    groups = {}
+    for name in parents:
+        groups.setdefault(root(name), []).append(name)
+    return sorted(sorted(group) for group in groups.values() if len(group) > 1)
+
+def register_model_groups(registry: ExportRegistry, schema: Schema):
+    """Registers the models a lazy models package has to import together, see model_groups."""
+    namespace = namespace_for(schema.name)
+    directory_name, module_pattern, _ = TABLE_EXPORTS["model"]
+    if namespace:
+        directory_name = f"{directory_name}/{namespace}"
+    for group in model_groups(schema):
+        registry.register_group(directory_name, [module_pattern.format(table_name=table_name) for table_name in group])
+
+def remove_table_outputs(table_name: str, project_name: str):
+    """Deletes every generated file of a table that no longer exists."""
+    for category in TABLE_EXPORTS:
+        if remove_file(file_path_for(project_name, table_name, category)):
+            logging.info(f"Removed {category} of dropped table {table_name}")
+
+def remove_empty_namespaces(project_name: str):
+    """Deletes the schema subpackages left with nothing but their __init__.py once their tables are dropped."""
+    for directory_name, _, _ in TABLE_EXPORTS.values():
+        package_path = os.path.join("projects", project_name, "app", directory_name)
+        if not path_exists(package_path):
+            continue
+        for namespace in namespace_packages(package_path):
+            namespace_path = os.path.join(package_path, namespace)
+            if not [name for name in list_directory(namespace_path) if name.endswith(".py") and name != "__init__.py"]:
+                remove_directory(namespace_path)
+                logging.info(f"Removed empty package {namespace_path}")
+
+def namespace_packages(package_path: str) -> List[str]:
+    """Schema subpackages of a generated package; everything else in it is a module or __pycache__."""
+    return [name for name in list_directory(package_path) if not name.endswith(".py") and name != "__pycache__"]
+
+def table_outputs_exist(table_name: str, project_name: str) -> bool:
+    return all(path_exists(file_path_for(project_name, table_name, category)) for category in TABLE_EXPORTS)
+
+def class_name_for(table_name: str) -> str:
+    """Convert table_name (like tournament_rankings) to ClassName (like TournamentRankings)."""
+    return ''.join(word.capitalize() for word in table_name.split('_'))
+
+def attribute_name_for(column_name: str) -> str:
+    """Python attribute name for a column, avoiding keywords and invalid identifiers."""
+    attribute = re.sub(r'\W', '_', column_name)
+    if not attribute.isidentifier() or keyword.iskeyword(attribute):
+        attribute = f"{attribute}_" if attribute.isidentifier() else f"_{attribute}"
+    return attribute
 
-    # Read the existing content
-    with open(init_path, 'r') as f:
-        content = f.readlines()
+# ============================
+# Model Generation
+# ============================
 
-    # If the new import already exists, no need to update
-    if new_import + "\n" in content:
-        logging.debug(f"{class_name} is already present in __init__.py of {directory_name}.")
-        return
+UUID_DEFAULTS = ("gen_random_uuid()", "uuid_generate_v4()")
+TIMESTAMP_DEFAULTS = ("CURRENT_TIMESTAMP", "now()")
+
+def column_default_argument(column: Column) -> str:
+    if not column.default or column.is_identity or column.default.startswith("nextval("):
+        return ""
+    if column.default in UUID_DEFAULTS:
+        return "default=uuid4"
+    if column.default in TIMESTAMP_DEFAULTS:
+        return "server_default=func.now()"
+    return f"server_default=text({column.default!r})"
+
+def enum_variable_for(enum_type: str) -> str:
+    return re.sub(r'\W', '_', enum_type) + "_enum"
+
+def generated_foreign_keys(table: Table, schema: Schema) -> List[ForeignKey]:
+    """Foreign keys pointing at generated models, the only ones that can become ForeignKey()s and relationships."""
+    return [fk for fk in table.foreign_keys if fk.referred_schema == table.schema
+            and fk.referred_table in schema.tables and schema.tables[fk.referred_table].primary_key]
+
+def is_unique_key(table: Table, columns: List[str]) -> bool:
+    return set(columns) in [set(table.primary_key)] + [set(unique) for unique in table.unique_constraints]
+
+def free_name(name: str, taken: set) -> str:
+    if name in taken:
+        name = f"{name}_relation"
+    while name in taken:
+        name += "_"
+    taken.add(name)
+    return name
+
+def many_to_one_names(table: Table, schema: Schema) -> Dict[str, str]:
+    """
+    Names of the table's many-to-one relationships by foreign key constraint.
 
-    # Remove existing __all__ declaration
-    content = [line for line in content if not line.startswith("__all__")]
+    A player_id foreign key becomes `player`, a composite one is named after the
+    referred table; names taken by a column get a _relation suffix.
+    """
+    taken = {attribute_name_for(column.name) for column in table.columns}
+    names = {}
+    for fk in generated_foreign_keys(table, schema):
+        column = fk.columns[0]
+        base = column[:-3] if len(fk.columns) == 1 and column.endswith("_id") and len(column) > 3 else fk.referred_table
+        names[fk.name] = free_name(attribute_name_for(base), taken)
+    return names
+
+def one_to_many_names(table: Table, schema: Schema) -> Dict[Tuple[str, str], str]:
+    """
+    Names of the relationships back from the table to the tables referencing it, by (table, constraint).
 
-    # Append the new import
-    content.append(new_import + "\n")
+    They are named after the referencing table and, when it has several foreign keys
+    to this one, after its many-to-one side as well, e.g. `tournament_rankings_by_winner`.
+    """
+    taken = {attribute_name_for(column.name) for column in table.columns} | set(many_to_one_names(table, schema).values())
+    incoming = schema.referencing(table)
+    per_table = {}
+    for other, _ in incoming:
+        per_table[other.name] = per_table.get(other.name, 0) + 1
+    names = {}
+    for other, fk in incoming:
+        base = other.name if per_table[other.name] == 1 else f"{other.name}_by_{many_to_one_names(other, schema)[fk.name]}"
+        names[(other.name, fk.name)] = free_name(attribute_name_for(base), taken)
+    return names
+
+def relationships_for(table: Table, schema: Schema) -> List[Dict]:
+    """
+    Both sides of every foreign key between the table and other generated models.
 
-    # Extracting existing names
-    item_names = [line.split()[3] for line in content if line.startswith("from .") and line.split()[3] not in ["'", ","]]
+    Many-to-one relationships come from the table's own foreign keys, one-to-many ones
+    (one-to-one when the referencing columns are unique) from the foreign keys of other
+    tables pointing at it. Each side names the other in back_populates.
 
-    # Ensure no duplicates
-    item_names = list(set(item_names))
+    Returns:
+    - List[Dict]: name, target class, whether it holds a list, and the relationship() arguments.
+    """
+    relationships = []
+    for fk_name, name in many_to_one_names(table, schema).items():
+        fk = next(fk for fk in table.foreign_keys if fk.name == fk_name)
+        arguments = [f"foreign_keys=[{', '.join(attribute_name_for(column) for column in fk.columns)}]"]
+        if fk.referred_table == table.name:
+            # Self-reference: the referred columns are the remote side
+            arguments.append(f"remote_side=[{', '.join(attribute_name_for(column) for column in fk.referred_columns)}]")
+        back_populates = one_to_many_names(schema.tables[fk.referred_table], schema)[(table.name, fk.name)]
+        arguments.append(f"back_populates='{back_populates}'")
+        relationships.append({"name": name, "target": model_class_for(fk.referred_table, table.schema), "many": False,
+                              "arguments": arguments})
+
+    for (other_name, fk_name), name in one_to_many_names(table, schema).items():
+        other = schema.tables[other_name]
+        fk = next(fk for fk in other.foreign_keys if fk.name == fk_name)
+        other_class = model_class_for(other_name, table.schema)
+        columns = ", ".join(f"{other_class}.{attribute_name_for(column)}" for column in fk.columns)
+        arguments = [f"foreign_keys='[{columns}]'", f"back_populates='{many_to_one_names(other, schema)[fk_name]}'"]
+        many = not is_unique_key(other, fk.columns)
+        if not many:
+            arguments.append("uselist=False")
+        relationships.append({"name": name, "target": other_class, "many": many, "arguments": arguments})
+    return relationships
+
+def model_context(table: Table, schema: Schema) -> Dict:
+    """
+    Builds the template context for a model from the introspected table.
 
-    # Add the updated __all__ declaration
-    all_declaration = "__all__ = [" + ", ".join([f"'{name}'" for name in item_names]) + "]"
-    content.append(all_declaration + "\n")
+    Args:
+    - table (Table): Table to generate the model for.
+    - schema (Schema): The whole schema, used to resolve enum types and foreign key targets.
 
-    # Write the updated content back to __init__.py
-    with open(init_path, 'w') as f:
-        f.writelines(content)
+    Returns:
+    - Dict: Context for the model template.
+    """
+    attributes = {column.name: attribute_name_for(column.name) for column in table.columns}
+
+    enums = {}
+    for column in table.columns:
+        if column.enum_type:
+            labels = ", ".join(repr(label) for label in schema.enums.get(column.enum_type, []))
+            name = enum_variable_for(column.enum_type)
+            type_schema, type_name = split_type_name(column.enum_type)
+            # Outside of the default schema the type has to be looked up in its own
+            type_arguments = f"name='{type_name}'" + ("" if type_schema == DEFAULT_SCHEMA else f", schema='{type_schema}'")
+            enums[column.name] = {
+                "name": name,
+                "definition": f"{name} = Enum({labels}, {type_arguments})"
+            }
+
+    foreign_keys = generated_foreign_keys(table, schema)
+    single_column_fks = {fk.columns[0]: fk for fk in foreign_keys if len(fk.columns) == 1}
+    # Referred tables are in the table's schema, which SQLAlchemy needs spelled out outside of the default one
+    qualifier = "" if table.schema == DEFAULT_SCHEMA else f"{table.schema}."
+
+    columns = []
+    for column in table.columns:
+        column_type = map_sqlalchemy_type(column.name, column.data_type, enums, column.element_type)
+        if column_type in ("String", "CHAR") and column.length:
+            column_type = f"{column_type}({column.length})"
+        arguments = [column_type]
+        if attributes[column.name] != column.name:
+            arguments.insert(0, repr(column.name))
+        if column.name in single_column_fks:
+            fk = single_column_fks[column.name]
+            arguments.append(f"db.ForeignKey('{qualifier}{fk.referred_table}.{fk.referred_columns[0]}')")
+        if column.name in table.primary_key:
+            arguments.append("primary_key=True")
+        default_argument = column_default_argument(column)
+        if default_argument:
+            arguments.append(default_argument)
+        if column.name == 'updated_at':
+            arguments.append("onupdate=func.now()")
+        if not column.is_nullable and column.name not in table.primary_key:
+            arguments.append("nullable=False")
+        columns.append({"attribute": attributes[column.name], "arguments": arguments})
+
+    table_args = []
+    for fk in foreign_keys:
+        if len(fk.columns) > 1:
+            referred = ", ".join(f"'{qualifier}{fk.referred_table}.{name}'" for name in fk.referred_columns)
+            table_args.append(f"db.ForeignKeyConstraint({fk.columns!r}, [{referred}])")
+    if qualifier:
+        table_args.append(f"{{'schema': {table.schema!r}}}")
+
+    # Straight-line serialization code for the known columns
+    fields = []
+    for column in table.columns:
+        attribute = attributes[column.name]
+        expression, encoder = json_encoder_for(column.data_type)
+        value = f"self.{attribute}"
+        if expression:
+            value = f"None if {value} is None else {expression.format(value)}"
+        fields.append({"key": column.name, "attribute": attribute, "value": value, "encoder": encoder})
+    serialization_imports = sorted({f["encoder"] for f in fields if f["encoder"] and f["encoder"] != "str"})
+
+    column_code = [argument for column in columns for argument in column["arguments"]]
+    core_imports, postgresql_imports = sqlalchemy_imports(column_code + [e["definition"] for e in enums.values()])
+    if any("func." in argument for argument in column_code):
+        core_imports.append("func")
+    if any("text(" in argument for argument in column_code):
+        core_imports.append("text")
 
-    logging.debug(f"Updated __init__.py for {class_name} in {directory_name} at {init_path}")
+    return {
+        **basic_context(table),
+        "columns": columns,
+        "enum_definitions": sorted({e["definition"] for e in enums.values()}),
+        "relationships": relationships_for(table, schema),
+        "fields": fields,
+        "serialization_imports": serialization_imports,
+        "table_args": table_args,
+        "primary_key": [attributes[name] for name in table.primary_key],
+        "core_imports": core_imports,
+        "postgresql_imports": postgresql_imports,
+        "uses_uuid": "default=uuid4" in column_code,
+    }
 
-def snake_case(s):
-    """Convert CamelCase to snake_case."""
-    return re.sub(r'(?<!^)(?=[A-Z])', '_', s).lower()
+def model_jobs(schema: Schema, project_name: str, tables: List[Table] = None) -> List["RenderJob"]:
+    """Render jobs of the models of the given tables, every mappable table of the schema by default."""
+    tables = schema.mappable_tables() if tables is None else tables
+    return [("model", output_name_for(table), project_name, model_context(table, schema), "default") for table in tables]
 
 # ============================
-# Model Generation
+# API Structure Generation
 # ============================
-def split_classes_to_files(project_name: str, filename):
-    # Determine the directory of the provided file
-    directory = os.path.dirname(filename)
-    
-    # Read the input file
-    with open(filename, 'r') as f:
-        content = f.read()
-
-    # Split content based on class definition
-    classes = re.split(r'(?=class [A-Za-z_][A-Za-z0-9_]*\()', content)
-    
-    # Common headers (imports and other initializations)
-    headers = classes[0]
-    
-    # Transform the headers
-    headers = transform_model_content(headers)
-    
-    # Iterate over each class content and create separate files
-    for cls in classes[1:]:
-        # Extract class name
-        class_name = re.search(r'class ([A-Za-z_][A-Za-z0-9_]*)\(', cls).group(1)
-        file_name = f"{snake_case(class_name)}_model.py"
-
-        # Transform the class content
-        cls = transform_model_content(cls)
 
-        # Create new file with class name in the same directory
-        new_file_path = os.path.join(directory, file_name)
-        with open(new_file_path, 'w') as f:
-            f.write(headers + "\n\n")
-            f.write(cls)
-
-        update_init_file(project_name, "models", snake_case(class_name).capitalize(), "from .{}_model import {}")        
-
-    rename_relationships_in_model(new_file_path)
+def api_jobs(schema: Schema, project_name: str, tables: List[Table] = None, template_type: str = "default",
+             filter_opt_in: Dict[str, List[str]] = None, count_options: Dict = None) -> List["RenderJob"]:
+    """
+    Render jobs of the controllers, repositories and services of the given tables, every mappable table of the schema by default.
 
-def transform_model_content(content):
-    # Remove the SQLAlchemy instantiation first
-    content = content.replace("db = SQLAlchemy()", "")
-    
-    # Remove the utf-8 coding line
-    content = content.replace("# coding: utf-8", "")
-    
-    # Replace the import and ensure newline separation
-    content = content.replace("from flask_sqlalchemy import SQLAlchemy", 
-                              "from ..database.extensions import db\nfrom app.models.model_mixins import ModelToDictMixin\n\n")
-    
-    # Add the mixin to the class definition using regex (ensure newline separation before the class definition)
-    content = re.sub(r'class ([A-Za-z_][A-Za-z0-9_]*)\(db.Model\):', r'\nclass \1(db.Model, ModelToDictMixin):', content)
-    
-    return content.strip()
+    The shared __init__.py files are not rendered here, they are written once from an
+    ExportRegistry after every table is rendered, so the output does not depend on the
+    number of workers.
 
-def generate_model_for_database(db_info: Dict[str, str], project_name: str):
-    logging.info(f"Generating model for table {db_info['db_name']} in project {project_name}")
-    
-    # Construct the database URL from the db_info dictionary
-    database_url = f"postgresql://{db_info['db_username']}:{db_info['db_password']}@{db_info['db_host']}:{db_info['db_port']}/{db_info['db_name']}"
-
-    # Use the file_path_for function to get the path for the model
-    output_file = f"projects/{project_name}/app/models/all_tables.txt"
-
-    dir_path = os.path.dirname(output_file)
-    os.makedirs(dir_path, exist_ok=True)
-
-    # Construct the command
-    command = [
-        "flask-sqlacodegen",
-        database_url,
-        "--outfile", output_file,
-        "--flask",
-        "--nobackrefs",
-        "--noinflect"
-    ]
-
-    # Run the command
-    subprocess.run(command, check=True)
-    split_classes_to_files(project_name, output_file)
-
-def rename_relationships_in_model(model_file):
-    with open(model_file, 'r') as f:
-        content = f.readlines()
-
-    # A pattern to match the db.relationship lines
-    pattern = re.compile(r'(\w+) = db\.relationship\(')
-    
-    new_content = []
-    for line in content:
-        match = pattern.search(line)
-        if match:
-            # Extract the variable name before the relationship
-            var_name = match.group(1)
-
-            # If the variable name is generic (like user1, parent1, etc.), rename it
-            if var_name.endswith("1"):
-                # Extract the associated field name from the primaryjoin clause
-                field_name_match = re.search(r'primaryjoin=\'\w+\.(\w+) ==', line)
-                if field_name_match:
-                    field_name = field_name_match.group(1)
-                    new_name = f"{field_name}_relation"
-                    line = line.replace(var_name, new_name)
-        new_content.append(line)
-
-    # Write the updated content back to the model file
-    with open(model_file, 'w') as f:
-        f.writelines(new_content)
+    filter_opt_in maps table names, schema-qualified outside of the default schema, to columns
+    that list endpoints may filter on without an index. count_options pick each table's count
+    strategy, see count_strategy_for.
+    """
+    tables = schema.mappable_tables() if tables is None else tables
+    filter_opt_in = filter_opt_in or {}
+    jobs = []
+    for table in tables:
+        context = api_context(table, schema, filter_opt_in.get(table.qualified_name, ()),
+                              count_strategy_for(table, count_options))
+        jobs += [(category, output_name_for(table), project_name, context, template_type) for category in API_CATEGORIES]
+    return jobs
 
 # ============================
-# Controller Generation
+# Parallel Rendering
 # ============================
 
-def generate_controller_for_table(table_name: str, project_name: str, template_type: str = "default"):
-    logging.debug(f"Generating controller for table {table_name} in project {project_name} using {template_type} template")
-    
-    context = basic_context(table_name)
-    render_and_save("controller", table_name, project_name, context, template_type)
-    # Update the __init__.py file
-    update_init_file(project_name, "controllers", table_name, "from .{}_controller import {}_bp")
+API_CATEGORIES = ["controller", "repository", "service"]
 
-# ============================
-# Repository Generation
-# ============================
-
-def generate_repository_for_table(table_name: str, project_name: str, template_type: str = "default"):
-    logging.debug(f"Generating repository for table {table_name} in project {project_name} using {template_type} template")
+RenderJob = Tuple[str, str, str, Dict, str]  # render_file arguments
 
-    context = basic_context(table_name)
-    render_and_save("repository", table_name, project_name, context, template_type)
-    # Update the __init__.py file with the new repository
-    update_init_file(project_name, "repositories", table_name.capitalize(), "from .{}_repository import {}Repository")
+def render_job(job: RenderJob) -> Tuple[str, str, str, float]:
+    """Renders one file, returning its table, path and content with the time taken."""
+    return (job[1], *render_file(*job))
 
-# ============================
-# Service Generation
-# ============================
+def render_job_batch(jobs: List[RenderJob]) -> List[Tuple[str, str, str, float]]:
+    return [render_job(job) for job in jobs]
 
-def generate_service_for_table(table_name: str, project_name: str, template_type: str = "default"):
-    logging.debug(f"Generating service for table {table_name} in project {project_name} using {template_type} template")
+def save_job_results(results) -> List[Tuple[str, float, int, bool]]:
+    """Writes rendered files in the current process, returning each one's table, render time, bytes written and whether it changed."""
+    return [(table_name, elapsed, *save_rendered(table_name, path, content))
+            for table_name, path, content, elapsed in results]
 
-    context = basic_context(table_name)
-    render_and_save("service", table_name, project_name, context, template_type)
-    # Update the __init__.py file
-    update_init_file(project_name, "services", table_name.capitalize(), "from .{}_service import {}Service")
+def record_job_stats(stats: List[Tuple[str, float, int, bool]], in_worker_processes: bool = False):
+    """Adds per-table render statistics to the active profiler, and the render totals when worker processes could not."""
+    profiler = active_profiler()
+    if profiler is None:
+        return
+    for table_name, elapsed, bytes_written, written in stats:
+        profiler.add_table(table_name, elapsed, bytes_written, written)
+    if in_worker_processes:
+        profiler.add(renders=len(stats), render_time=sum(elapsed for _, elapsed, _, _ in stats))
 
-# ============================
-# API Structure Generation
-# ============================
+def run_render_jobs(jobs: List[RenderJob], workers: int = 1, executor: str = "process"):
+    """
+    Renders the given files, serially or on a thread/process pool, and writes them.
 
-def generate_api_structure_for_table(db_info: Dict[str, str], table_name: str, project_name: str):
-    logging.info(f"Generating API structure for table {table_name} in project {project_name}")
+    Workers only render and hand the content back: every file is written by the calling
+    thread, through the active output writer when there is one.
 
-    # Generate controller for the table
-    generate_controller_for_table(table_name, project_name)
+    Args:
+    - jobs (List[RenderJob]): render_file arguments, one tuple per file.
+    - workers (int): Number of workers; 1 renders in the current thread.
+    - executor (str): "process" or "thread".
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        record_job_stats(save_job_results(map(render_job, jobs)))
+        return
 
-    # Generate repository for the table
-    generate_repository_for_table(table_name, project_name)
+    if executor == "process":
+        # Worker processes build their own template environment with the same settings
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=configure_renderer, initargs=renderer_settings())
+    elif executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError(f"Unknown executor '{executor}', expected 'process' or 'thread'")
 
-    # Generate services for the table
-    generate_service_for_table(table_name, project_name)
+    # Hand out a few batches per worker to keep the inter-process overhead low
+    batch_size = max(1, len(jobs) // (workers * 4))
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    with pool:
+        # Batches are written as they come back, in order; iterating re-raises the first exception from a worker
+        stats = [job_stats for results in pool.map(render_job_batch, batches) for job_stats in save_job_results(results)]
+    record_job_stats(stats, in_worker_processes=executor == "process")
 
 # ============================
 # run.py Generation
 # ============================
 
-def create_run_py(project_name):
-    controllers_path = os.path.join("projects", project_name, "app", "controllers")
-    
-    # List all blueprint files
-    blueprint_files = [f[:-3] for f in os.listdir(controllers_path) if f.endswith('.py') and f != '__init__.py']
-    
-    # Extract the base name from filenames and construct import and registration statements
-    imports, registrations = generate_blueprint_statements(blueprint_files)
-    
-    # Load the Jinja2 template
-    with open("templates/run_py.j2", "r") as template_file:
-        template_content = template_file.read()
+def controller_modules(path: str) -> List[str]:
+    return sorted(f[:-3] for f in list_directory(path) if f.endswith('.py') and f != '__init__.py')
 
-    template = Template(template_content)
+def create_run_py(project_name, template_type: str = "default", metrics: bool = False, lazy: bool = False,
+                  schemas: List[Schema] = ()):
+    controllers_path = os.path.join("projects", project_name, "app", "controllers")
+    context = {"metrics": metrics, "lazy": lazy}
 
+    if lazy:
+        # Routes are registered from a table in run.py, the controllers are only imported when first used
+        context["routes"], context["controllers"] = generate_route_table(schemas)
+    else:
+        # List all blueprint files
+        blueprint_files = controller_modules(controllers_path)
+
+        # Extract the base name from filenames and construct import and registration statements
+        imports, registrations = generate_blueprint_statements(blueprint_files)
+
+        # Schemas other than the default one have a subpackage each
+        for namespace in namespace_packages(controllers_path):
+            namespace_imports, namespace_registrations = generate_blueprint_statements(
+                controller_modules(os.path.join(controllers_path, namespace)), namespace)
+            imports += namespace_imports
+            registrations += namespace_registrations
+        context["imports"], context["registrations"] = imports, registrations
+    
     # Render the template with the imports and registrations
-    run_content = template.render(imports=imports, registrations=registrations)
+    template_name = "run_py.j2" if template_type == "default" else f"{template_type}_run_py.j2"
+    run_content = render_template(template_name, context)
     run_py_path = os.path.join("projects", project_name, "run.py")
     
     # Write the rendered content to run.py
-    with open(run_py_path, "w") as run_file:
-        run_file.write(run_content)
-
-    logging.info("run.py has been generated.")
+    if write_file(run_py_path, run_content):
+        logging.info("run.py has been generated.")
+    else:
+        logging.info("run.py is up to date.")
 
-def generate_blueprint_statements(filenames):
+def generate_route_table(schemas: List[Schema]) -> Tuple[List[List[str]], List[Tuple[str, str]]]:
+    """
+    The routes of every generated controller, for run.py to register them lazily.
+
+    Routes come from controller_routes, which the controller decorators are rendered from
+    as well, and cover every mappable table, including the unchanged ones that were not
+    rendered in this run. Controllers with the same routes, i.e. the same primary key
+    shape, share one list. Controllers are listed like the eager registrations: the
+    default schema's first, then each namespace's, by module name.
+
+    Returns:
+    - Tuple: The distinct route lists, each route as a "(rule, methods, view function)"
+      literal, and per URL prefix the literal of its (controller module, blueprint name,
+      route list index).
+    """
+    tables = [table for schema in schemas for table in schema.mappable_tables()]
+    tables.sort(key=lambda table: (namespace_for(table.schema) != "", namespace_for(table.schema), f"{table.name}_controller"))
+    route_lists = []
+    controllers = []
+    for table in tables:
+        routes = [repr(route) for route in controller_routes(table)]
+        if routes not in route_lists:
+            route_lists.append(routes)
+        module_name = "app.controllers." + output_name_for(table).replace("/", ".") + "_controller"
+        controller = (module_name, blueprint_name_for(table), route_lists.index(routes))
+        controllers.append((repr(url_prefix_for(table)), repr(controller)))
+    return route_lists, controllers
+
+def generate_blueprint_statements(filenames, namespace: str = ""):
     # Extract the base name from filenames and construct import and registration statements
     imports = []
     registrations = []
+    package = f"app.controllers.{namespace}" if namespace else "app.controllers"
     
     for filename in filenames:
         # Extract blueprint name from the filename
-        blueprint_name = filename.split('_controller')[0]
+        table_name = filename.split('_controller')[0]
+        # Same as blueprint_name_for
+        blueprint_name = f"{namespace}_{table_name.lower()}" if namespace else table_name.lower()
+        url_prefix = f"/{namespace}/{table_name}" if namespace else f"/{table_name}"
         
         # Construct import statement
-        import_statement = f"from app.controllers.{filename} import {blueprint_name}_bp"
+        import_statement = f"from {package}.{filename} import {blueprint_name}_bp"
         imports.append(import_statement)
         
         # Construct registration statement
-        registration_statement = f"app.register_blueprint({blueprint_name}_bp, url_prefix='/{blueprint_name}')"
+        registration_statement = f"app.register_blueprint({blueprint_name}_bp, url_prefix='{url_prefix}')"
         registrations.append(registration_statement)
     
     return imports, registrations
@@ -314,21 +689,15 @@ def create_database_extensions(project_name):
     path = os.path.join("projects", project_name, "app", "database", "extensions.py")
     
     # Check if file already exists
-    if os.path.exists(path):
+    if path_exists(path):
         logging.info(f"'extensions.py' already exists. Skipping creation.")
         return
     
-    # Ensure the directory exists
-    directory = os.path.dirname(path)
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    
     content = """\
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 """
-    with open(path, 'w') as f:
-        f.write(content)
+    write_file(path, content)
     
     logging.info(f"'extensions.py' has been created successfully!")
@@ -1,8 +1,127 @@
-from core.project_manager import ProjectManager
+import argparse
+import logging
+import sys
+import time
+from core.batch_runner import BATCH_JOBS, connection_info, format_summary, load_batch_manifest, run_batch
+from core.project_manager import INTROSPECT_CONNECTIONS, ProjectManager
+from core.structure_generator import COUNT_STRATEGIES, TEMPLATE_TYPES
+from utils.template_renderer import TEMPLATES_DIR, shared_renderer
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a Flask API from a PostgreSQL database.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of workers rendering tables in parallel (default: 1)")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                        help="Worker pool type used when --workers is above 1 (default: process)")
+    parser.add_argument("--full", action="store_true",
+                        help="Regenerate every table, ignoring the manifest of the previous run")
+    parser.add_argument("--template-cache", default=None,
+                        help="Directory for the compiled template cache, reused across runs")
+    parser.add_argument("--replica", action="append", default=[], metavar="HOST[:PORT]",
+                        help="Read replica the generated app sends its reads to, repeatable")
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="Connections kept open per database by the generated app (default: 10)")
+    parser.add_argument("--statement-timeout", type=int, default=None, metavar="MS",
+                        help="Statement timeout of the generated app's connections (default: 30000)")
+    parser.add_argument("--cache-ttl", type=int, default=None, metavar="SECONDS",
+                        help="Lifetime of the generated app's cached read responses, 0 disables the cache (default: 60)")
+    parser.add_argument("--count-strategy", choices=COUNT_STRATEGIES, default=None,
+                        help="How list endpoints count tables above --exact-count-rows: pg_class estimate, "
+                             "exact count cached for --count-cache-ttl seconds, or exact count (default: estimate)")
+    parser.add_argument("--exact-count-rows", type=int, default=None, metavar="ROWS",
+                        help="Tables estimated below this many rows are always counted exactly (default: 100000)")
+    parser.add_argument("--count-cache-ttl", type=int, default=None, metavar="SECONDS",
+                        help="Lifetime of the counts of the cached strategy, 0 counts every time (default: 60)")
+    parser.add_argument("--template-type", choices=TEMPLATE_TYPES, default="default",
+                        help="App to generate: sync Flask (default) or async Quart over asyncpg (async)")
+    parser.add_argument("--filterable", action="append", default=[], metavar="[SCHEMA.]TABLE.COLUMN",
+                        help="Let list endpoints filter and sort on a column that no index backs, repeatable")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Time requests, SQL statements and pool checkouts in the generated app, served at /metrics")
+    parser.add_argument("--slow-query-ms", type=int, default=None, metavar="MS",
+                        help="Log statements slower than this with --metrics, 0 disables the log (default: 200)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write a per-phase and per-table timing report to projects/<name>/profile.json")
+    parser.add_argument("--cprofile", default=None, metavar="PATH",
+                        help="Also dump cProfile statistics of the run to PATH, implies --profile")
+    parser.add_argument("--schema", action="append", default=[], metavar="PATTERN",
+                        help="Schema to generate the API of, wildcards allowed, repeatable (default: public)")
+    parser.add_argument("--exclude-schema", action="append", default=[], metavar="PATTERN",
+                        help="Schema to leave out of the ones selected by --schema, wildcards allowed, repeatable")
+    parser.add_argument("--introspect-connections", type=int, default=INTROSPECT_CONNECTIONS, metavar="N",
+                        help=f"Connections introspecting schemas concurrently (default: {INTROSPECT_CONNECTIONS})")
+    parser.add_argument("--introspect", default=None, metavar="PATH",
+                        help="Introspect the database, save the schema snapshot to PATH and stop without generating")
+    parser.add_argument("--snapshot", default=None, metavar="PATH",
+                        help="Generate from a schema snapshot saved by --introspect, without connecting to the database")
+    parser.add_argument("--lazy", action="store_true",
+                        help="Import each controller and model of the generated app on first use rather than at startup")
+    parser.add_argument("--batch", default=None, metavar="MANIFEST",
+                        help="Generate every project of a JSON manifest without prompting, see core/batch_runner.py")
+    parser.add_argument("--batch-jobs", type=int, default=BATCH_JOBS, metavar="N",
+                        help=f"Projects of --batch generated concurrently (default: {BATCH_JOBS})")
+    return parser.parse_args(argv)
+
+def filter_opt_in(columns):
+    """Groups [SCHEMA.]TABLE.COLUMN arguments by table, schema-qualified outside of the public schema."""
+    opt_in = {}
+    for qualified in columns:
+        table, _, column = qualified.rpartition(".")
+        if table.startswith("public."):
+            table = table[len("public."):]
+        opt_in.setdefault(table, []).append(column)
+    return opt_in
+
+def create_manager(args, **kwargs):
+    pool_options = {"pool_size": args.pool_size, "statement_timeout_ms": args.statement_timeout}
+    count_options = {"large_tables": args.count_strategy, "exact_rows": args.exact_count_rows,
+                     "cache_ttl": args.count_cache_ttl}
+    return ProjectManager(template_cache_path=args.template_cache, workers=args.workers, executor=args.executor,
+                          incremental=not args.full, replicas=args.replica,
+                          pool_options={key: value for key, value in pool_options.items() if value is not None},
+                          cache_options={} if args.cache_ttl is None else {"ttl": args.cache_ttl},
+                          count_options={key: value for key, value in count_options.items() if value is not None},
+                          template_type=args.template_type, filter_opt_in=filter_opt_in(args.filterable),
+                          metrics=args.metrics,
+                          metrics_options={} if args.slow_query_ms is None else {"slow_query_ms": args.slow_query_ms},
+                          profile=args.profile, cprofile_path=args.cprofile,
+                          snapshot_path=args.snapshot, snapshot_output=args.introspect,
+                          schema_include=args.schema, schema_exclude=args.exclude_schema,
+                          introspect_connections=args.introspect_connections, lazy=args.lazy, **kwargs)
+
+def batch_projects(args):
+    """(name, ProjectManager factory) of every project of the --batch manifest, whose arguments are all checked first."""
+    manifest = load_batch_manifest(args.batch)
+    projects = []
+    for project in manifest["projects"]:
+        project_args = parse_args(manifest.get("args", []) + project.get("args", []))
+        if project_args.batch or project_args.introspect or project_args.profile or project_args.cprofile:
+            sys.exit(f"Project {project['name']}: --batch, --introspect, --profile and --cprofile are not available in a batch")
+        # Every project renders with the batch's one template environment
+        project_args.template_cache = args.template_cache
+        projects.append((project["name"], lambda project_args=project_args, project=project: create_manager(
+            project_args, project_name=project["name"], db_info=connection_info(project.get("connection")),
+            interactive=False)))
+    return projects
 
 def main():
-    manager = ProjectManager()
-    manager.run()
+    args = parse_args()
+    if args.introspect and args.snapshot:
+        sys.exit("--introspect reads the database and --snapshot replaces it, use one or the other")
+    if args.batch:
+        # Log lines interleave across projects, the thread name tells them apart
+        logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(threadName)s:%(message)s", force=True)
+        started = time.perf_counter()
+        try:
+            projects = batch_projects(args)
+        except (FileNotFoundError, ValueError) as error:
+            sys.exit(str(error))
+        # Compiled once, the templates serve every project
+        shared_renderer(TEMPLATES_DIR, args.template_cache)
+        results = run_batch(projects, args.batch_jobs)
+        print(format_summary(results, time.perf_counter() - started))
+        sys.exit(0 if all(result["status"] == "ok" for result in results) else 1)
+    create_manager(args).run()
 
 if __name__ == "__main__":
     main()
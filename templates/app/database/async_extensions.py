@@ -0,0 +1,67 @@
+from itertools import count
+from types import SimpleNamespace
+from quart import g
+from sqlalchemy import Column, ForeignKey, ForeignKeyConstraint
+from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, relationship
+
+REPLICA_BIND_PREFIX = "replica_"
+
+
+class Model(AsyncAttrs, DeclarativeBase):
+    pass
+
+
+# Models are declared with the same db.* names as under Flask-SQLAlchemy, so both app types share them
+db = SimpleNamespace(Model=Model, Column=Column, ForeignKey=ForeignKey,
+                     ForeignKeyConstraint=ForeignKeyConstraint, relationship=relationship)
+
+_sessionmakers = {}
+_replica_turn = count()
+
+
+def init_db(app):
+    """Creates the primary and replica engines from the app config and disposes of them when the app stops serving."""
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    engines = {None: create_async_engine(app.config["SQLALCHEMY_DATABASE_URI"], **options)}
+    for key, bind in app.config.get("SQLALCHEMY_BINDS", {}).items():
+        bind = dict(bind)
+        engines[key] = create_async_engine(bind.pop("url"), **bind)
+
+    # Rows stay readable after commit without another round trip, lazy refreshes can't run outside a greenlet
+    _sessionmakers.update({key: async_sessionmaker(engine, expire_on_commit=False) for key, engine in engines.items()})
+    app.teardown_appcontext(close_sessions)
+
+    @app.after_serving
+    async def dispose_engines():
+        for engine in engines.values():
+            await engine.dispose()
+
+
+def session():
+    """AsyncSession on the primary, one per app context."""
+    if "session" not in g:
+        g.session = _sessionmakers[None]()
+    return g.session
+
+
+def read_session():
+    """
+    AsyncSession for read-only queries, bound to one of the replicas in turn.
+
+    Falls back to the primary's session when no replica is configured. Reads on a
+    replica may lag behind writes just committed on the primary.
+    """
+    if "read_session" not in g:
+        replicas = sorted(key for key in _sessionmakers if key and key.startswith(REPLICA_BIND_PREFIX))
+        if not replicas:
+            return session()
+        g.read_session = _sessionmakers[replicas[next(_replica_turn) % len(replicas)]]()
+    return g.read_session
+
+
+async def close_sessions(exception=None):
+    for name in ("read_session", "session"):
+        opened = g.pop(name, None)
+        if opened is not None:
+            await opened.close()
@@ -1,3 +1,37 @@
+from itertools import count
+from flask import g
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import Session
 
 db = SQLAlchemy()
+
+REPLICA_BIND_PREFIX = "replica_"
+
+_replica_turn = count()
+
+
+def init_db(app):
+    db.init_app(app)
+    app.teardown_appcontext(close_read_session)
+
+
+def read_session():
+    """
+    Session for read-only queries, bound to one of the replicas in turn.
+
+    Falls back to the primary's db.session when no replica is configured. Reads on a
+    replica may lag behind writes just committed on the primary.
+    """
+    if "read_session" not in g:
+        replicas = sorted(key for key in db.engines if key and key.startswith(REPLICA_BIND_PREFIX))
+        if not replicas:
+            return db.session
+        engine = db.engines[replicas[next(_replica_turn) % len(replicas)]]
+        g.read_session = Session(bind=engine)
+    return g.read_session
+
+
+def close_read_session(exception=None):
+    session = g.pop("read_session", None)
+    if session is not None:
+        session.close()
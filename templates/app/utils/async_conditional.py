@@ -0,0 +1,13 @@
+from quart import current_app, jsonify, request
+
+
+async def cached_response(cached):
+    """JSON response for a CachedResponse, or 304 when the request's If-None-Match/If-Modified-Since still match."""
+    if cached.body is None:
+        return jsonify({"message": "Not Found"}), 404
+    response = current_app.response_class(cached.body, mimetype="application/json")
+    response.set_etag(cached.etag)
+    response.last_modified = cached.last_modified
+    # Clients may keep the response but must revalidate it before every reuse
+    response.cache_control.no_cache = True
+    return await response.make_conditional(request)
@@ -0,0 +1,58 @@
+import logging
+import threading
+from importlib import import_module
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_view(module_name, function_name):
+    """
+    A view that imports the controller module defining it on its first call, along with
+    the service, repository and models that module imports.
+
+    The view is a coroutine function itself, which Quart awaits on the event loop rather
+    than running it in its thread pool as it would a plain callable.
+    """
+    resolved = []
+
+    async def view(**kwargs):
+        if not resolved:
+            resolved.append(getattr(import_module(module_name), function_name))
+        return await resolved[0](**kwargs)
+
+    return view
+
+
+def register_lazy_routes(app, controllers, routes):
+    """
+    Adds the routes of every controller without importing any of them.
+
+    Endpoints are named "<blueprint>.<view function>" as if the blueprints had been
+    registered, so url_for() and the metrics' route labels do not change.
+
+    Args:
+    - controllers (dict): URL prefix -> (controller module, blueprint name, index into routes).
+    - routes (list): Lists of (rule, methods, view function) shared by the controllers.
+    """
+    for url_prefix, (module_name, blueprint_name, route_set) in controllers.items():
+        for rule, methods, function_name in routes[route_set]:
+            app.add_url_rule(url_prefix + rule, endpoint=f"{blueprint_name}.{function_name}",
+                             view_func=lazy_view(module_name, function_name), methods=methods)
+
+
+def prewarm_routes(controllers):
+    """
+    Imports every controller module on a daemon thread, so that the first requests find them loaded.
+
+    Imports only define classes and functions, so they do not touch the event loop.
+    """
+    def import_controllers():
+        for module_name, _, _ in controllers.values():
+            try:
+                import_module(module_name)
+            except Exception:
+                logger.exception("Prewarming %s failed", module_name)
+
+    thread = threading.Thread(target=import_controllers, name="prewarm-routes", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,64 @@
+from quart import has_request_context, request
+from quart.wrappers.response import IterableBody, ResponseBody
+from app.utils.instrumentation import (DEFAULT_SLOW_QUERY_MS, PROMETHEUS_CONTENT_TYPE, TimedAsyncAdaptedQueuePool,
+                                       finish_request, install_query_hooks, render_metrics, start_request,
+                                       time_pool_checkouts)
+
+
+def _current_request():
+    # Kept on the request rather than on g, which streamed responses don't share
+    return getattr(request, "metrics", None) if has_request_context() else None
+
+
+class _TimedBody(ResponseBody):
+    """Streamed body calling finish once it has been sent or abandoned."""
+
+    def __init__(self, body, finish):
+        self.body = body
+        self.finish = finish
+
+    async def __aenter__(self):
+        await self.body.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        try:
+            await self.body.__aexit__(exc_type, exc_value, tb)
+        finally:
+            self.finish()
+
+    def __aiter__(self):
+        return self.body.__aiter__()
+
+
+def init_metrics(app):
+    """
+    Times requests, SQL statements and pool checkouts, and serves them at /metrics.
+
+    Must run before init_db(app), whose engines pick up the timed pool class from the
+    config. Statements slower than SLOW_QUERY_MS are logged to app.slow_queries.
+    """
+    time_pool_checkouts(app.config, TimedAsyncAdaptedQueuePool)
+    install_query_hooks(_current_request, app.config.get("SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS))
+
+    @app.before_request
+    async def start_timer():
+        # The URL rule rather than the path, so that every row of a table shares one series
+        request.metrics = start_request(request.url_rule.rule if request.url_rule else "unmatched")
+
+    @app.after_request
+    async def record_request(response):
+        state = getattr(request, "metrics", None)
+        if state is not None:
+            state["status"] = response.status_code
+            method = request.method
+            if isinstance(response.response, IterableBody):
+                # Streamed responses are timed to their last chunk
+                response.response = _TimedBody(response.response, lambda: finish_request(state, method))
+            else:
+                finish_request(state, method)
+        return response
+
+    @app.route("/metrics")
+    async def metrics():
+        return app.response_class(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,61 @@
+from quart import Response, current_app, stream_with_context
+
+STREAM_BATCH_SIZE = 1000
+
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def iter_batches(get_session, projection, batch_size=STREAM_BATCH_SIZE, where=(), order_by=()):
+    """
+    Runs the projection's select() through a server-side cursor and yields its rows in lists of at most batch_size.
+
+    Only one batch of rows is held in memory at a time, whatever the size of the table.
+
+    Args:
+    - get_session: Callable returning the AsyncSession to read from. It is called once the
+      response starts streaming, so the session belongs to the streaming context and is
+      closed at its teardown, not at the end of the view.
+    """
+    statement = projection.select().where(*where).order_by(*order_by)
+    result = await get_session().stream(statement.execution_options(yield_per=batch_size))
+    try:
+        async for batch in projection.rows(result).partitions(batch_size):
+            yield batch
+    finally:
+        await result.close()
+
+
+def stream_response(batches, serialize, fmt="json"):
+    """
+    Builds a streaming response emitting one chunk per batch, as a JSON array or as NDJSON.
+
+    Args:
+    - batches: Async iterable of lists of rows, see iter_batches.
+    - serialize: Callable turning one row into a JSON-serializable object.
+    - fmt (str): "json" or "ndjson".
+    """
+    dumps = current_app.json.dumps
+
+    @stream_with_context
+    async def generate_json():
+        yield "["
+        first = True
+        async for batch in batches:
+            if not batch:
+                continue
+            chunk = ",".join(dumps(serialize(row)) for row in batch)
+            yield chunk if first else "," + chunk
+            first = False
+        yield "]"
+
+    @stream_with_context
+    async def generate_ndjson():
+        async for batch in batches:
+            if batch:
+                yield "".join(dumps(serialize(row)) + "\n" for row in batch)
+
+    generate = generate_ndjson if fmt == "ndjson" else generate_json
+    return Response(generate(), mimetype=STREAM_FORMATS[fmt])
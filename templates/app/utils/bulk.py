@@ -0,0 +1,151 @@
+import json
+from sqlalchemy import cast, column, delete, literal, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from app.database.extensions import db
+
+BULK_BATCH_SIZE = 1000
+
+
+class BulkError(ValueError):
+    pass
+
+
+def parse_bulk_body(data, mimetype):
+    """Reads a JSON array, or NDJSON when the request is sent as application/x-ndjson."""
+    try:
+        if mimetype == "application/x-ndjson":
+            return [json.loads(line) for line in data.splitlines() if line.strip()]
+        rows = json.loads(data)
+    except ValueError as e:
+        raise BulkError(f"Invalid JSON: {e}")
+    if not isinstance(rows, list):
+        raise BulkError("Expected a JSON array or NDJSON body")
+    return rows
+
+
+def _batches(items, size=BULK_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkWriter:
+    """
+    Multi-row INSERT/UPDATE/DELETE for one model, each call running in a single transaction.
+
+    Rows use column names as keys, like the API's JSON payloads. Rows sharing the same set
+    of keys are sent together as one statement per batch.
+
+    Statements run on db.session unless a session is passed, e.g. the sync facade that
+    AsyncSession.run_sync() hands to its callable.
+    """
+
+    def __init__(self, model, primary_key, conflict_keys=()):
+        self.model = model
+        self.table = model.__table__
+        self.primary_key = list(primary_key)
+        self.conflict_keys = [list(key) for key in conflict_keys]
+
+    def _normalize(self, rows):
+        grouped = {}
+        for row in rows:
+            if not isinstance(row, dict):
+                raise BulkError("Every row must be a JSON object")
+            unknown = [key for key in row if key not in self.model.FIELD_ATTRIBUTES]
+            if unknown:
+                raise BulkError(f"Unknown fields: {', '.join(unknown)}")
+            grouped.setdefault(tuple(sorted(row)), []).append(row)
+        return grouped
+
+    def _run(self, work, session=None):
+        session = session or db.session
+        try:
+            count = work(session)
+            session.commit()
+            return count
+        except DBAPIError as e:
+            session.rollback()
+            raise BulkError(str(e.orig).strip())
+        except Exception:
+            session.rollback()
+            raise
+
+    def insert(self, rows, upsert=False, conflict_key=None, session=None):
+        """
+        Inserts rows with multi-row INSERT statements, optionally as an upsert.
+
+        Args:
+        - rows (list): Row objects keyed by column name.
+        - upsert (bool): Update rows that conflict on the conflict key instead of failing.
+        - conflict_key (list): Columns of the primary key or unique constraint to upsert on, the primary key by default.
+        - session: Session running the statements, db.session by default.
+        """
+        conflict_key = list(conflict_key or self.primary_key)
+        if upsert and conflict_key not in self.conflict_keys:
+            raise BulkError(f"No unique constraint on ({', '.join(conflict_key)})")
+
+        def work(session):
+            count = 0
+            for keys, group in self._normalize(rows).items():
+                for batch in _batches(group):
+                    statement = insert(self.table).values(batch)
+                    if upsert:
+                        updated = {key: statement.excluded[key] for key in keys if key not in conflict_key}
+                        statement = (statement.on_conflict_do_update(index_elements=conflict_key, set_=updated)
+                                     if updated else statement.on_conflict_do_nothing(index_elements=conflict_key))
+                    count += session.execute(statement).rowcount
+            return count
+
+        return self._run(work, session)
+
+    def update(self, rows, session=None):
+        """
+        Updates rows identified by their primary key, one UPDATE ... FROM (VALUES ...) per batch.
+        """
+        def work(session):
+            count = 0
+            for keys, group in self._normalize(rows).items():
+                if not set(self.primary_key) <= set(keys):
+                    raise BulkError(f"Every row needs its primary key ({', '.join(self.primary_key)})")
+                assigned = [key for key in keys if key not in self.primary_key]
+                if not assigned:
+                    continue
+                types = [self.table.c[key].type for key in keys]
+                for batch in _batches(group):
+                    # Parameters reach the VALUES list untyped, so each one is cast to its target column's type
+                    source = values(*[column(key, type_) for key, type_ in zip(keys, types)], name="bulk_rows").data(
+                        [tuple(cast(literal(row[key], type_), type_) for key, type_ in zip(keys, types)) for row in batch]
+                    )
+                    statement = (
+                        update(self.table)
+                        .where(*[self.table.c[key] == source.c[key] for key in self.primary_key])
+                        .values({key: source.c[key] for key in assigned})
+                    )
+                    count += session.execute(statement).rowcount
+            return count
+
+        return self._run(work, session)
+
+    def delete(self, keys, session=None):
+        """
+        Deletes rows by primary key. Keys are plain values, or objects holding every primary key column.
+        """
+        def work(session):
+            if len(self.primary_key) == 1:
+                name = self.primary_key[0]
+                if not all(name in key for key in keys if isinstance(key, dict)):
+                    raise BulkError(f"Every key must be a value or an object with {name}")
+                ids = [key[name] if isinstance(key, dict) else key for key in keys]
+                target = self.table.c[name]
+            else:
+                if not all(isinstance(key, dict) and set(self.primary_key) <= set(key) for key in keys):
+                    raise BulkError(f"Every key must be an object with {', '.join(self.primary_key)}")
+                ids = [tuple(key[name] for name in self.primary_key) for key in keys]
+                target = tuple_(*[self.table.c[name] for name in self.primary_key])
+
+            count = 0
+            for batch in _batches(ids):
+                count += session.execute(delete(self.table).where(target.in_(batch))).rowcount
+            return count
+
+        return self._run(work, session)
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, time as time_of_day, timezone
+
+DEFAULT_TTL = 60
+DEFAULT_MAXSIZE = 1024
+
+# body is the serialized JSON response, None for a missing row
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "last_modified"])
+
+
+def _json_default(value):
+    # Generated serializers encode top-level values, array elements can still be dates, UUIDs or decimals
+    if isinstance(value, (datetime, date, time_of_day)):
+        return value.isoformat()
+    return str(value)
+
+
+class MemoryBackend:
+    """
+    In-process LRU store holding at most maxsize entries, each expiring ttl seconds after it was stored.
+
+    Any object with the same get/set/counter/incr methods can replace it, e.g. a thin
+    wrapper around Redis (GET/SETEX/INCR) so that every worker process shares one cache
+    and sees the other processes' invalidations.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        # Counters live apart from the entries so that LRU eviction can never reset them
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class ResponseCache:
+    """
+    Caches serialized read responses per table, invalidated by the writes of the service layer.
+
+    Keys embed a per-table generation counter. A write bumps the counters of the tables it
+    can affect, so their older entries are never read again and simply age out. A read that
+    races with a write stores its result under the old generation, where nobody looks.
+    """
+
+    def __init__(self, backend=None, ttl=DEFAULT_TTL):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+
+    def init_app(self, app, backend=None):
+        """Reads RESPONSE_CACHE_TTL (0 disables caching) and RESPONSE_CACHE_SIZE from the app config."""
+        self.ttl = app.config.get("RESPONSE_CACHE_TTL", DEFAULT_TTL)
+        self.backend = backend or MemoryBackend(app.config.get("RESPONSE_CACHE_SIZE", DEFAULT_MAXSIZE))
+
+    def fetch(self, table, key, load):
+        """
+        Returns the CachedResponse for key, calling load() for the payload on a miss.
+
+        Args:
+        - table (str): Table the response is read from.
+        - key (str): Identifies the response within the table, e.g. the method and its arguments.
+        - load: Callable returning a JSON-serializable payload, None when nothing was found.
+        """
+        if self.ttl <= 0:
+            return self._build(load())
+        cache_key = self._key(table, key)
+        cached = self.backend.get(cache_key)
+        if cached is None:
+            cached = self._build(load())
+            self.backend.set(cache_key, cached, self.ttl)
+        return cached
+
+    async def fetch_async(self, table, key, load):
+        """fetch() for a coroutine function load."""
+        if self.ttl <= 0:
+            return self._build(await load())
+        cache_key = self._key(table, key)
+        cached = self.backend.get(cache_key)
+        if cached is None:
+            cached = self._build(await load())
+            self.backend.set(cache_key, cached, self.ttl)
+        return cached
+
+    def _key(self, table, key):
+        return f"{table}:{self.backend.counter(table)}:{key}"
+
+    def invalidate(self, *tables):
+        for table in tables:
+            self.backend.incr(table)
+
+    @staticmethod
+    def _build(payload):
+        if payload is None:
+            return CachedResponse(None, None, None)
+        body = json.dumps(payload, separators=(",", ":"), default=_json_default)
+        etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+        # HTTP dates have a resolution of one second
+        return CachedResponse(body, etag, datetime.now(timezone.utc).replace(microsecond=0))
+
+
+response_cache = ResponseCache()
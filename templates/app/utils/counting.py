@@ -0,0 +1,93 @@
+from sqlalchemy import text
+from app.utils.cache import MemoryBackend
+
+DEFAULT_COUNT_CACHE_TTL = 60
+
+# Values of ?count=; besides these, a table's own strategy can be "cached", an exact count kept for COUNT_CACHE_TTL seconds
+COUNT_PARAMETERS = ("exact", "estimate", "none")
+
+# The planner's row estimate, maintained by VACUUM and ANALYZE, read without touching the table
+ESTIMATE_QUERY = text(
+    "SELECT c.reltuples::bigint FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+    "WHERE n.nspname = :schema AND c.relname = :table"
+)
+
+
+class CountError(ValueError):
+    pass
+
+
+def count_strategy(requested, default, filtered):
+    """
+    The strategy counting a list response: the one ?count= asks for, else the table's own.
+
+    Estimates cover the whole table, so a filtered list of a table estimated by default
+    leaves its total out rather than report the table's size; ?count=exact still counts it.
+
+    Args:
+    - requested (str): The ?count= value, None when absent.
+    - default (str): The table's strategy, chosen at generation time from its size.
+    - filtered (bool): Whether the list is filtered.
+    """
+    if requested is None:
+        return "none" if default == "estimate" and filtered else default
+    if requested not in COUNT_PARAMETERS:
+        raise CountError(f"Unknown count '{requested}', expected one of {', '.join(COUNT_PARAMETERS)}")
+    if requested == "estimate" and filtered:
+        raise CountError("count=estimate counts the whole table and cannot be combined with filters")
+    return requested
+
+
+def estimated_total(reltuples):
+    """The row estimate of pg_class, None while the table has never been analyzed (-1, or 0 before PostgreSQL 14)."""
+    return reltuples if reltuples is not None and reltuples > 0 else None
+
+
+class CountCache:
+    """
+    Exact counts kept for ttl seconds per table and filters.
+
+    Like the response cache, keys embed a per-table generation counter that the writes of
+    the service layer bump, so a count never outlives a write made through this process.
+    """
+
+    def __init__(self, backend=None, ttl=DEFAULT_COUNT_CACHE_TTL):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+
+    def init_app(self, app, backend=None):
+        """Reads COUNT_CACHE_TTL (0 counts every time) from the app config."""
+        self.ttl = app.config.get("COUNT_CACHE_TTL", DEFAULT_COUNT_CACHE_TTL)
+        self.backend = backend or MemoryBackend()
+
+    def fetch(self, table, key, count):
+        """The cached count for key, calling count() on a miss."""
+        if self.ttl <= 0:
+            return count()
+        cache_key = self._key(table, key)
+        total = self.backend.get(cache_key)
+        if total is None:
+            total = count()
+            self.backend.set(cache_key, total, self.ttl)
+        return total
+
+    async def fetch_async(self, table, key, count):
+        """fetch() for a coroutine function count."""
+        if self.ttl <= 0:
+            return await count()
+        cache_key = self._key(table, key)
+        total = self.backend.get(cache_key)
+        if total is None:
+            total = await count()
+            self.backend.set(cache_key, total, self.ttl)
+        return total
+
+    def _key(self, table, key):
+        return f"{table}:{self.backend.counter(table)}:{key}"
+
+    def invalidate(self, *tables):
+        for table in tables:
+            self.backend.incr(table)
+
+
+count_cache = CountCache()
@@ -0,0 +1,92 @@
+from datetime import date, datetime, time
+from sqlalchemy import Enum
+
+# Query parameters of the list endpoints that are not filters
+LIST_PARAMETERS = {"limit", "cursor", "sort", "fields", "include", "stream", "count"}
+
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, values: column.in_(values),
+    "isnull": lambda column, value: column.is_(None) if value else column.is_not(None),
+}
+
+BOOLEANS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+
+class FilterError(ValueError):
+    pass
+
+
+def filter_parameters(args):
+    """The filter parameters among a request's query arguments."""
+    return {key: value for key, value in args.items() if key not in LIST_PARAMETERS}
+
+
+def _parse_bool(raw):
+    try:
+        return BOOLEANS[raw.lower()]
+    except KeyError:
+        raise FilterError(f"Invalid boolean '{raw}'")
+
+
+class FilterSet:
+    """
+    Turns ?col=value and ?col__op=value query parameters into SQL conditions on a model.
+
+    Only filterable columns are accepted: those backed by an index, plus the ones opted in
+    at generation time, so a client can't make the database scan a large table by accident.
+    Values are converted to the column's Python type and sent as bound parameters.
+    """
+
+    def __init__(self, model, filterable):
+        self.model = model
+        self.filterable = set(filterable)
+
+    def _coerce(self, column, raw):
+        if isinstance(column.type, Enum):
+            if raw not in column.type.enums:
+                raise FilterError(f"Invalid value '{raw}' for '{column.key}'")
+            return raw
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            return raw
+        try:
+            if python_type is bool:
+                return _parse_bool(raw)
+            if python_type in (datetime, date, time):
+                return python_type.fromisoformat(raw)
+            return python_type(raw)
+        except (TypeError, ValueError, ArithmeticError):
+            raise FilterError(f"Invalid value '{raw}' for '{column.key}'")
+
+    def where(self, filters):
+        """
+        SQL conditions for a mapping of filter parameters, e.g. {"status": "active", "rating__gte": "1200"}.
+
+        Operators are eq (the default), ne, gt, gte, lt, lte, in (comma-separated values) and isnull (true/false).
+        """
+        clauses = []
+        for key, raw in filters.items():
+            name, separator, operator = key.rpartition("__")
+            if not separator or operator not in OPERATORS:
+                name, operator = key, "eq"
+            if name not in self.model.FIELD_ATTRIBUTES:
+                raise FilterError(f"Unknown field '{name}'")
+            if name not in self.filterable:
+                raise FilterError(f"Cannot filter by '{name}', it is not indexed")
+
+            column = getattr(self.model, self.model.FIELD_ATTRIBUTES[name])
+            if operator == "in":
+                value = [self._coerce(column, part) for part in raw.split(",")]
+            elif operator == "isnull":
+                value = _parse_bool(raw)
+            else:
+                value = self._coerce(column, raw)
+            clauses.append(OPERATORS[operator](column, value))
+        return clauses
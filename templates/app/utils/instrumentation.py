@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DEFAULT_SLOW_QUERY_MS = 200
+
+# Upper bounds in seconds, from a cached read to a request stuck behind a lock
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in sorted(self._values.items())]
+        return lines
+
+
+class Histogram:
+    """Cumulative buckets, sum and count per label set, as Prometheus expects them."""
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, observations) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', bound)])} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {observations}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {observations}")
+        return lines
+
+
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "Time from the start of a request to the end of its response.",
+                             ("method", "route", "status"))
+QUERY_DURATION = Histogram("db_query_duration_seconds", "Execution time of one SQL statement.", ("route", "operation"))
+QUERIES_PER_REQUEST = Histogram("db_queries_per_request", "SQL statements run by one request.", ("route",),
+                                buckets=QUERY_COUNT_BUCKETS)
+ROWS = Counter("db_rows_total", "Rows returned or affected by SQL statements, as reported by the driver.",
+               ("route", "operation"))
+SLOW_QUERIES = Counter("db_slow_queries_total", "SQL statements slower than the slow query threshold.", ("route",))
+POOL_WAIT = Histogram("db_pool_checkout_wait_seconds",
+                      "Time spent getting a connection from the pool, including opening a new one.")
+
+METRICS = [REQUEST_DURATION, QUERY_DURATION, QUERIES_PER_REQUEST, ROWS, SLOW_QUERIES, POOL_WAIT]
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_metrics():
+    """Every metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """TimedQueuePool for asyncio engines."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+
+def time_pool_checkouts(config, poolclass):
+    """Makes the primary and replica engines configured in an app config use the given timed pool class."""
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = {**config.get("SQLALCHEMY_ENGINE_OPTIONS", {}), "poolclass": poolclass}
+    config["SQLALCHEMY_BINDS"] = {key: {**bind, "poolclass": poolclass}
+                                  for key, bind in config.get("SQLALCHEMY_BINDS", {}).items()}
+
+
+# Settings of the query listeners, which are attached to the Engine class once per process
+_query_hooks = {"installed": False, "current_request": None, "slow_query_ms": DEFAULT_SLOW_QUERY_MS}
+_query_hooks_lock = threading.Lock()
+
+
+def install_query_hooks(current_request, slow_query_ms=DEFAULT_SLOW_QUERY_MS):
+    """
+    Times every statement of every engine and attributes it to the request that ran it.
+
+    The listeners are registered once per process, so apps created again, e.g. by tests,
+    do not count each statement several times; the last call's settings apply.
+
+    Args:
+    - current_request: Callable returning the per-request metrics dict ("route" and
+      "queries"), None outside of a request.
+    - slow_query_ms (int): Statements slower than this are logged, 0 disables the log.
+    """
+    with _query_hooks_lock:
+        _query_hooks["current_request"] = current_request
+        _query_hooks["slow_query_ms"] = slow_query_ms
+        if _query_hooks["installed"]:
+            return
+        _query_hooks["installed"] = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        state = _query_hooks["current_request"]()
+        route = state["route"] if state else "none"
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        if state:
+            state["queries"] += 1
+        QUERY_DURATION.observe(elapsed, route=route, operation=operation)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            ROWS.inc(cursor.rowcount, route=route, operation=operation)
+        slow_query_ms = _query_hooks["slow_query_ms"]
+        if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+            SLOW_QUERIES.inc(route=route)
+            # Parameters are left out, they may hold personal data
+            slow_query_logger.warning("Slow query (%.1f ms) in %s: %s", elapsed * 1000, route, " ".join(statement.split()))
+
+
+def start_request(route):
+    return {"route": route, "queries": 0, "started": time.perf_counter(), "status": 500}
+
+
+def finish_request(state, method):
+    REQUEST_DURATION.observe(time.perf_counter() - state["started"], method=method, route=state["route"],
+                             status=state["status"])
+    QUERIES_PER_REQUEST.observe(state["queries"], route=state["route"])
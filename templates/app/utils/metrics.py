@@ -0,0 +1,38 @@
+from flask import has_request_context, request
+from app.utils.instrumentation import (DEFAULT_SLOW_QUERY_MS, PROMETHEUS_CONTENT_TYPE, TimedQueuePool, finish_request,
+                                       install_query_hooks, render_metrics, start_request, time_pool_checkouts)
+
+
+def _current_request():
+    # Kept on the request rather than on g, which streamed responses don't share
+    return getattr(request, "metrics", None) if has_request_context() else None
+
+
+def init_metrics(app):
+    """
+    Times requests, SQL statements and pool checkouts, and serves them at /metrics.
+
+    Must run before init_db(app), whose engines pick up the timed pool class from the
+    config. Statements slower than SLOW_QUERY_MS are logged to app.slow_queries.
+    """
+    time_pool_checkouts(app.config, TimedQueuePool)
+    install_query_hooks(_current_request, app.config.get("SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS))
+
+    @app.before_request
+    def start_timer():
+        # The URL rule rather than the path, so that every row of a table shares one series
+        request.metrics = start_request(request.url_rule.rule if request.url_rule else "unmatched")
+
+    @app.after_request
+    def record_request(response):
+        state = getattr(request, "metrics", None)
+        if state is not None:
+            state["status"] = response.status_code
+            method = request.method
+            # Called once the body has been sent, so streamed responses are timed to their last chunk
+            response.call_on_close(lambda: finish_request(state, method))
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return app.response_class(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
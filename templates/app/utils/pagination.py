@@ -0,0 +1,195 @@
+import json
+import base64
+from collections import namedtuple
+from datetime import date, datetime, time
+from sqlalchemy import and_, or_, tuple_
+from app.database.extensions import db
+from app.utils.serialization import Projection
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+Page = namedtuple("Page", ["items", "next_cursor", "prev_cursor", "limit"])
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def parse_limit(raw):
+    """The ?limit= page size, None when absent; anything but a positive integer is rejected rather than ignored."""
+    if raw is None:
+        return None
+    try:
+        limit = int(raw)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise PaginationError(f"Invalid limit '{raw}', expected a positive integer")
+    return limit
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, separators=(",", ":"), default=_json_default).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except ValueError:
+        raise PaginationError("Invalid cursor")
+    if not isinstance(payload, dict) or not {"s", "d", "v", "l"} <= payload.keys():
+        raise PaginationError("Invalid cursor")
+    return payload
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _coerce(column, value):
+    """Turns a JSON cursor value back into the Python type of the column."""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type in (datetime, date, time):
+            return python_type.fromisoformat(value)
+        return value if isinstance(value, python_type) else python_type(value)
+    except (TypeError, ValueError):
+        raise PaginationError("Invalid cursor")
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a model, ordered by its primary key or another unique, non-null key.
+
+    Each page continues from the key values of the last (or first) row of the previous page,
+    so the database seeks into the key's index instead of skipping OFFSET rows.
+    """
+
+    def __init__(self, model, primary_key, unique_columns=(), sortable_columns=()):
+        self.model = model
+        self.primary_key = list(primary_key)
+        self.unique_columns = set(unique_columns)
+        # Sortable columns come by the name the API exposes, like ?col= filters; everything else here uses attribute names
+        self.sortable_columns = {model.FIELD_ATTRIBUTES[name] for name in sortable_columns} | self.unique_columns
+        if len(self.primary_key) == 1:
+            self.unique_columns.add(self.primary_key[0])
+            self.sortable_columns.add(self.primary_key[0])
+
+    def parse_sort(self, sort):
+        """
+        Parses a sort specification like "-created_at,name", by the names the API exposes, into (attribute, descending) pairs.
+
+        Columns that don't identify a row on their own get the primary key appended as tie-breaker.
+        """
+        order = []
+        for part in (sort or "").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            descending = part.startswith("-")
+            name = part.lstrip("+-")
+            attribute = self.model.FIELD_ATTRIBUTES.get(name)
+            if attribute not in self.sortable_columns:
+                raise PaginationError(f"Cannot sort by '{name}'")
+            order.append((attribute, descending))
+
+        if not any(name in self.unique_columns for name, _ in order):
+            descending = order[-1][1] if order else False
+            used = {name for name, _ in order}
+            order += [(name, descending) for name in self.primary_key if name not in used]
+        return order
+
+    def _seek_condition(self, order, values, forward):
+        columns = [getattr(self.model, name) for name, _ in order]
+        values = [_coerce(column, value) for column, value in zip(columns, values)]
+        if len(values) != len(columns):
+            raise PaginationError("Invalid cursor")
+
+        # Going backwards flips every comparison
+        after = [descending != forward for _, descending in order]
+        if len(set(after)) == 1:
+            # A single row comparison can use a composite index directly
+            left, right = (tuple_(*columns), tuple_(*values)) if len(columns) > 1 else (columns[0], values[0])
+            return left > right if after[0] else left < right
+
+        clauses = []
+        for i, column in enumerate(columns):
+            equal = [columns[j] == values[j] for j in range(i)]
+            clauses.append(and_(*equal, column > values[i] if after[i] else column < values[i]))
+        return or_(*clauses)
+
+    def _order_by(self, order, forward):
+        clauses = []
+        for name, descending in order:
+            column = getattr(self.model, name)
+            clauses.append(column.desc() if descending == forward else column.asc())
+        return clauses
+
+    def order_by(self, sort):
+        """ORDER BY clauses of a sort specification, for reads that are not paginated."""
+        return self._order_by(self.parse_sort(sort), True)
+
+    def _cursor(self, item, sort, order, direction, limit):
+        values = [getattr(item, name) for name, _ in order]
+        return encode_cursor({"s": sort, "d": direction, "v": values, "l": limit})
+
+    def paginate(self, limit=None, cursor=None, sort=None, projection=None, where=(), execute=None):
+        """
+        Fetches one page of the model.
+
+        Args:
+        - limit (int): Page size, capped at MAX_PAGE_SIZE.
+        - cursor (str): Opaque cursor from a previous page, None for the first page.
+        - sort (str): Sort specification, ignored when a cursor is given (the cursor carries its own).
+        - projection (Projection): Fields to select, the whole entity by default.
+        - where: Additional filter clauses.
+        - execute: Callable running the statement, db.session.execute by default.
+
+        Returns:
+        - Page: The items plus cursors of the next and previous pages (None at either end).
+        """
+        execute = execute or db.session.execute
+        projection = projection or Projection(self.model)
+        payload = decode_cursor(cursor) if cursor else None
+        if payload:
+            sort = payload["s"]
+        if limit is None:
+            limit = payload["l"] if payload else DEFAULT_PAGE_SIZE
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        order = self.parse_sort(sort)
+        forward = not payload or payload["d"] == "next"
+
+        # Projected rows still need the key columns to build the cursors
+        key_columns = [] if projection.entity else [
+            getattr(self.model, name) for name, _ in order
+            if not any(column.key == name for column in projection.columns)
+        ]
+        statement = projection.select(*key_columns).where(*where)
+        if payload:
+            statement = statement.where(self._seek_condition(order, payload["v"], forward))
+        statement = statement.order_by(*self._order_by(order, forward)).limit(limit + 1)
+
+        items = list(projection.rows(execute(statement)))
+        has_more = len(items) > limit
+        items = items[:limit]
+        if not forward:
+            items.reverse()
+
+        next_cursor = prev_cursor = None
+        if items:
+            if (has_more if forward else payload is not None):
+                next_cursor = self._cursor(items[-1], sort, order, "next", limit)
+            if (payload is not None if forward else has_more):
+                prev_cursor = self._cursor(items[0], sort, order, "prev", limit)
+        return Page(items, next_cursor, prev_cursor, limit)
@@ -0,0 +1,54 @@
+from flask import Response, current_app, stream_with_context
+
+STREAM_BATCH_SIZE = 1000
+
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_batches(execute, projection, batch_size=STREAM_BATCH_SIZE, where=(), order_by=()):
+    """
+    Runs the projection's select() through a server-side cursor and yields its rows in lists of at most batch_size.
+
+    Only one batch of rows is held in memory at a time, whatever the size of the table.
+    """
+    statement = projection.select().where(*where).order_by(*order_by)
+    result = execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for batch in projection.rows(result).partitions(batch_size):
+            yield batch
+    finally:
+        result.close()
+
+
+def stream_response(batches, serialize, fmt="json"):
+    """
+    Builds a streaming response emitting one chunk per batch, as a JSON array or as NDJSON.
+
+    Args:
+    - batches: Iterable of lists of rows, see iter_batches.
+    - serialize: Callable turning one row into a JSON-serializable object.
+    - fmt (str): "json" or "ndjson".
+    """
+    dumps = current_app.json.dumps
+
+    def generate_json():
+        yield "["
+        first = True
+        for batch in batches:
+            if not batch:
+                continue
+            chunk = ",".join(dumps(serialize(row)) for row in batch)
+            yield chunk if first else "," + chunk
+            first = False
+        yield "]"
+
+    def generate_ndjson():
+        for batch in batches:
+            if batch:
+                yield "".join(dumps(serialize(row)) + "\n" for row in batch)
+
+    generate = generate_ndjson if fmt == "ndjson" else generate_json
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[fmt])
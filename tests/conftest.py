@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import Boolean, Column, Date, Enum, Integer, String
+from sqlalchemy.orm import declarative_base
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The generator's packages, and the templates' app/ package whose runtime helpers are copied verbatim into projects
+for path in (ROOT, os.path.join(ROOT, "templates")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+Base = declarative_base()
+
+
+class Player(Base):
+    """Shaped like a generated model, with column names that are not valid attribute names."""
+    __tablename__ = "players"
+
+    id = Column(Integer, primary_key=True)
+    class_ = Column("class", String(20), nullable=False)
+    rank_score = Column("Rank Score", Integer, nullable=False)
+    joined = Column(Date)
+    active = Column(Boolean)
+    mood = Column(Enum("happy", "sad", name="mood"))
+
+    RELATIONSHIPS = {}
+    FIELD_ATTRIBUTES = {"id": "id", "class": "class_", "Rank Score": "rank_score",
+                        "joined": "joined", "active": "active", "mood": "mood"}
+    FIELD_ENCODERS = {}
+
+    def to_dict(self):
+        return {key: getattr(self, attribute) for key, attribute in self.FIELD_ATTRIBUTES.items()}
+
+
+@pytest.fixture
+def player_model():
+    return Player
@@ -0,0 +1,61 @@
+import importlib
+import sys
+
+import pytest
+
+from core.export_registry import ExportRegistry
+
+
+def test_render_sorts_imports_and_all():
+    registry = ExportRegistry()
+    registry.register("models", "players", "Players")
+    registry.register("models", "games", "Games")
+    assert registry.render("models") == (
+        "# Auto-generated __init__.py for models\n"
+        "from .games import Games\n"
+        "from .players import Players\n"
+        "__all__ = ['Games', 'Players']\n"
+    )
+
+
+def test_render_of_unknown_package_is_empty():
+    assert ExportRegistry().render("models") == "# Auto-generated __init__.py for models\n__all__ = []\n"
+
+
+def write_package(root, name, registry, modules):
+    package = root / name
+    package.mkdir()
+    (package / "__init__.py").write_text(registry.render(name))
+    for module_name, source in modules.items():
+        (package / f"{module_name}.py").write_text(source)
+
+
+def test_lazy_package_imports_modules_on_first_access(tmp_path, monkeypatch):
+    registry = ExportRegistry(lazy=True)
+    for module_name, symbol in (("players", "Players"), ("games", "Games"), ("clubs", "Clubs")):
+        registry.register("lazypkg", module_name, symbol)
+    registry.register_group("lazypkg", ["players", "games"])
+    write_package(tmp_path, "lazypkg", registry, {
+        "players": "class Players: pass\n",
+        "games": "class Games: pass\n",
+        "clubs": "class Clubs: pass\n",
+    })
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    package = importlib.import_module("lazypkg")
+    try:
+        assert package.__all__ == ["Clubs", "Games", "Players"]
+        assert "lazypkg.players" not in sys.modules
+
+        assert package.Players.__name__ == "Players"
+        # The group comes along, the other modules don't
+        assert "lazypkg.games" in sys.modules
+        assert "lazypkg.clubs" not in sys.modules
+        assert "Players" in vars(package)
+
+        assert "Clubs" in dir(package)
+        with pytest.raises(AttributeError):
+            package.Missing
+    finally:
+        for name in [name for name in sys.modules if name == "lazypkg" or name.startswith("lazypkg.")]:
+            del sys.modules[name]
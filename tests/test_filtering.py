@@ -0,0 +1,75 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.utils.filtering import FilterError, FilterSet, filter_parameters
+
+
+def sql(clauses):
+    return [str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            for clause in clauses]
+
+
+@pytest.fixture
+def filters(player_model):
+    return FilterSet(player_model, ["id", "class", "Rank Score", "joined", "active", "mood"])
+
+
+def test_filter_parameters_leave_out_list_parameters():
+    args = {"limit": "10", "cursor": "x", "sort": "id", "fields": "id", "class": "a", "id__gte": "3"}
+    assert filter_parameters(args) == {"class": "a", "id__gte": "3"}
+
+
+def test_equality_is_the_default_operator(filters):
+    assert sql(filters.where({"class": "a", "Rank Score": "12"})) == \
+        ["players.class = 'a'", 'players."Rank Score" = 12']
+
+
+def test_operators(filters):
+    assert sql(filters.where({
+        "id__gte": "3",
+        "id__lt": "9",
+        "Rank Score__ne": "0",
+        "class__in": "a,b",
+        "joined__isnull": "false",
+    })) == [
+        "players.id >= 3",
+        "players.id < 9",
+        'players."Rank Score" != 0',
+        "players.class IN ('a', 'b')",
+        "players.joined IS NOT NULL",
+    ]
+
+
+def test_unknown_operator_is_part_of_the_name(filters):
+    with pytest.raises(FilterError, match="Unknown field 'id__like'"):
+        filters.where({"id__like": "3"})
+
+
+def test_values_are_converted_to_the_column_type(filters):
+    joined, active, mood = filters.where({"joined": "2024-05-01", "active": "yes", "mood": "sad"})
+    assert joined.right.value == date(2024, 5, 1)
+    assert sql([active]) == ["players.active = true"]
+    assert mood.right.value == "sad"
+
+
+@pytest.mark.parametrize("parameters", [
+    {"id": "three"},
+    {"joined__gt": "yesterday"},
+    {"active": "maybe"},
+    {"mood": "angry"},
+    {"id__in": "1,x"},
+    {"joined__isnull": "perhaps"},
+])
+def test_invalid_values_are_rejected(filters, parameters):
+    with pytest.raises(FilterError, match="Invalid"):
+        filters.where(parameters)
+
+
+def test_only_filterable_columns_are_accepted(player_model):
+    filters = FilterSet(player_model, ["id"])
+    with pytest.raises(FilterError, match="Cannot filter by 'class', it is not indexed"):
+        filters.where({"class": "a"})
+    with pytest.raises(FilterError, match="Unknown field 'class_'"):
+        filters.where({"class_": "a"})
@@ -0,0 +1,37 @@
+from core.generation_manifest import plan_regeneration
+
+FINGERPRINTS = {"games": "g1", "players": "p1"}
+
+
+def manifest(tables, templates_hash="t1"):
+    return {"templates_hash": templates_hash, "tables": tables}
+
+
+def test_first_run_generates_every_table():
+    assert plan_regeneration(None, "t1", FINGERPRINTS) == (["games", "players"], [])
+
+
+def test_unchanged_tables_are_skipped():
+    assert plan_regeneration(manifest(dict(FINGERPRINTS)), "t1", FINGERPRINTS) == ([], [])
+
+
+def test_changed_and_new_tables_are_regenerated():
+    previous = manifest({"games": "g0"})
+    assert plan_regeneration(previous, "t1", FINGERPRINTS) == (["games", "players"], [])
+    previous = manifest({"games": "g1", "players": "p0"})
+    assert plan_regeneration(previous, "t1", FINGERPRINTS) == (["players"], [])
+
+
+def test_new_templates_regenerate_every_table():
+    previous = manifest(dict(FINGERPRINTS), templates_hash="t0")
+    assert plan_regeneration(previous, "t1", FINGERPRINTS) == (["games", "players"], [])
+
+
+def test_dropped_tables_are_reported():
+    previous = manifest({**FINGERPRINTS, "moves": "m1", "clubs": "c1"})
+    assert plan_regeneration(previous, "t1", FINGERPRINTS) == ([], ["clubs", "moves"])
+
+
+def test_full_run_regenerates_every_table_and_still_drops():
+    previous = manifest({**FINGERPRINTS, "moves": "m1"})
+    assert plan_regeneration(previous, "t1", FINGERPRINTS, full=True) == (["games", "players"], ["moves"])
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+from utils.file_manager import read_file, write_file
+from utils.output_writer import OutputWriter, active_writer
+
+
+def write(root, relative, content):
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(content)
+
+
+def read(root, relative):
+    with open(os.path.join(root, relative)) as file:
+        return file.read()
+
+
+@pytest.fixture
+def root(tmp_path):
+    path = tmp_path / "project"
+    path.mkdir()
+    return str(path)
+
+
+def test_writes_are_staged_until_commit(root):
+    writer = OutputWriter(root)
+    with writer.session():
+        assert write_file(os.path.join(root, "app", "models", "players.py"), "class Players: pass\n")
+        assert not os.path.exists(os.path.join(root, "app"))
+        # Reads inside the session see the staged content
+        assert read_file(os.path.join(root, "app", "models", "players.py")) == "class Players: pass\n"
+        assert writer.exists(os.path.join("app", "models"))
+        assert writer.listdir("app") == ["models"]
+    assert read(root, "app/models/players.py") == "class Players: pass\n"
+    assert active_writer(root) == (None, None)
+    # The staging tree is cleaned up
+    assert os.listdir(os.path.dirname(root)) == ["project"]
+
+
+def test_identical_files_are_skipped(root):
+    write(root, "run.py", "print('hi')\n")
+    writer = OutputWriter(root)
+    with writer.session():
+        assert not writer.write("run.py", "print('hi')\n")
+        assert writer.write("config.py", "DEBUG = False\n")
+    report = writer.report()
+    assert (report["files_written"], report["files_skipped"]) == (1, 1)
+
+
+def test_removals_apply_on_commit(root):
+    write(root, "app/models/moves.py", "")
+    write(root, "app/controllers/moves/routes.py", "")
+    writer = OutputWriter(root)
+    with writer.session():
+        assert writer.remove(os.path.join("app", "models", "moves.py"))
+        assert writer.remove_directory(os.path.join("app", "controllers", "moves"))
+        assert not writer.exists(os.path.join("app", "models", "moves.py"))
+        assert writer.listdir("app/controllers") == []
+        assert os.path.exists(os.path.join(root, "app", "models", "moves.py"))
+    assert not os.path.exists(os.path.join(root, "app", "models", "moves.py"))
+    assert not os.path.exists(os.path.join(root, "app", "controllers", "moves"))
+
+
+def test_failed_session_leaves_the_project_untouched(root):
+    write(root, "app/models/players.py", "old\n")
+    writer = OutputWriter(root)
+    with pytest.raises(RuntimeError):
+        with writer.session():
+            writer.write(os.path.join("app", "models", "players.py"), "new\n")
+            writer.remove(os.path.join("app", "models", "players.py"))
+            writer.write(os.path.join("app", "models", "games.py"), "new\n")
+            raise RuntimeError("generation failed")
+    assert read(root, "app/models/players.py") == "old\n"
+    assert not os.path.exists(os.path.join(root, "app", "models", "games.py"))
+    assert os.listdir(os.path.dirname(root)) == ["project"]
+
+
+def test_swapped_directory_is_replaced_as_a_whole(root):
+    write(root, "app/models/players.py", "players\n")
+    write(root, "app/models/moves.py", "moves\n")
+    write(root, "run.py", "run\n")
+    live_inode = os.stat(os.path.join(root, "app")).st_ino
+    writer = OutputWriter(root, swapped=["app"])
+    with writer.session():
+        writer.write(os.path.join("app", "models", "games.py"), "games\n")
+        writer.remove(os.path.join("app", "models", "moves.py"))
+        writer.make_directory(os.path.join("app", "static"))
+    # A new directory took the place of the old one, with the unchanged files carried over
+    assert os.stat(os.path.join(root, "app")).st_ino != live_inode
+    assert sorted(os.listdir(os.path.join(root, "app", "models"))) == ["games.py", "players.py"]
+    assert read(root, "app/models/players.py") == "players\n"
+    assert os.path.isdir(os.path.join(root, "app", "static"))
+    assert read(root, "run.py") == "run\n"
+
+
+def test_swapped_directory_is_kept_when_nothing_in_it_changed(root):
+    write(root, "app/models/players.py", "players\n")
+    live_inode = os.stat(os.path.join(root, "app")).st_ino
+    writer = OutputWriter(root, swapped=["app"])
+    with writer.session():
+        writer.write("run.py", "run\n")
+    assert os.stat(os.path.join(root, "app")).st_ino == live_inode
+
+
+def test_last_files_are_moved_in_after_everything_else(root, monkeypatch):
+    applied = []
+    replace, remove = os.replace, os.remove
+
+    def recording_replace(source, target):
+        applied.append(os.path.relpath(target, root))
+        replace(source, target)
+
+    def recording_remove(path):
+        applied.append("-" + os.path.relpath(path, root))
+        remove(path)
+
+    monkeypatch.setattr(os, "replace", recording_replace)
+    monkeypatch.setattr(os, "remove", recording_remove)
+    write(root, "app/models/moves.py", "")
+    writer = OutputWriter(root, last=["manifest.json"])
+    with writer.session():
+        writer.write("manifest.json", "{}\n")
+        writer.write("run.py", "run\n")
+        writer.write("z.py", "z\n")
+        writer.remove(os.path.join("app", "models", "moves.py"))
+    assert applied == ["run.py", "z.py", "-" + os.path.join("app", "models", "moves.py"), "manifest.json"]
@@ -0,0 +1,115 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.utils.pagination import KeysetPaginator, PaginationError, decode_cursor, encode_cursor, parse_limit
+from conftest import Base
+
+
+def sql(clause):
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.fixture
+def paginator(player_model):
+    return KeysetPaginator(player_model, ["id"], sortable_columns=["class", "Rank Score"])
+
+
+@pytest.fixture
+def session(player_model):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(player_model(id=index, class_="ab"[index % 2], rank_score=index // 3)
+                        for index in range(1, 11))
+        session.commit()
+        yield session
+
+
+def test_cursor_round_trip():
+    payload = {"s": "-class", "d": "next", "v": ["b", 7, date(2024, 5, 1)], "l": 20}
+    cursor = encode_cursor(payload)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {**payload, "v": ["b", 7, "2024-05-01"]}
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", encode_cursor([1, 2]), encode_cursor({"s": None, "d": "next"})])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("raw, expected", [(None, None), ("1", 1), ("250", 250)])
+def test_parse_limit(raw, expected):
+    assert parse_limit(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["abc", "0", "-3", "", "1.5"])
+def test_parse_limit_rejects_anything_but_a_positive_integer(raw):
+    with pytest.raises(PaginationError):
+        parse_limit(raw)
+
+
+def test_parse_sort_maps_api_names_to_attributes(paginator):
+    assert paginator.parse_sort(None) == [("id", False)]
+    assert paginator.parse_sort("-class") == [("class_", True), ("id", True)]
+    assert paginator.parse_sort("Rank Score,-id") == [("rank_score", False), ("id", True)]
+
+
+@pytest.mark.parametrize("sort", ["class_", "joined", "missing"])
+def test_parse_sort_rejects_other_names(paginator, sort):
+    with pytest.raises(PaginationError):
+        paginator.parse_sort(sort)
+
+
+def test_seek_condition_compares_rows_in_one_direction(paginator):
+    order = paginator.parse_sort("class")
+    assert sql(paginator._seek_condition(order, ["b", 4], True)) == '(players.class, players.id) > (\'b\', 4)'
+    assert sql(paginator._seek_condition(order, ["b", 4], False)) == '(players.class, players.id) < (\'b\', 4)'
+    order = paginator.parse_sort("-id")
+    assert sql(paginator._seek_condition(order, ["4"], True)) == "players.id < 4"
+
+
+def test_seek_condition_expands_mixed_directions(paginator):
+    order = paginator.parse_sort("-Rank Score,id")
+    assert sql(paginator._seek_condition(order, [2, 4], True)) == \
+        'players."Rank Score" < 2 OR players."Rank Score" = 2 AND players.id > 4'
+
+
+def test_seek_condition_rejects_values_that_do_not_fit(paginator):
+    order = paginator.parse_sort("Rank Score")
+    with pytest.raises(PaginationError):
+        paginator._seek_condition(order, ["high", 4], True)
+    with pytest.raises(PaginationError):
+        paginator._seek_condition(order, [2], True)
+
+
+# Ids of the players 1..10 (class "b" for odd ids, rank score id // 3) in each sort order
+ORDERS = {
+    None: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    "-class": [9, 7, 5, 3, 1, 10, 8, 6, 4, 2],
+    "-Rank Score,id": [9, 10, 6, 7, 8, 3, 4, 5, 1, 2],
+}
+
+
+@pytest.mark.parametrize("sort", ORDERS)
+def test_pages_cover_every_row_once_in_both_directions(paginator, session, sort):
+    pages, cursor = [], None
+    while True:
+        page = paginator.paginate(limit=3, cursor=cursor, sort=sort, execute=session.execute)
+        pages.append([item.id for item in page.items])
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert [id for page in pages for id in page] == ORDERS[sort]
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+
+    # Walking back from the last page returns the same pages
+    back = [pages[-1]]
+    while page.prev_cursor is not None:
+        page = paginator.paginate(cursor=page.prev_cursor, execute=session.execute)
+        back.append([item.id for item in page.items])
+    assert back[::-1] == pages
@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from core.project_manager import ProjectManager
+from core.schema_model import Column, ForeignKey, Index, Schema, Table
+from core.schema_snapshot import build_snapshot, save_snapshot
+
+CONNECTION = {"db_host": "localhost", "db_port": "5432", "db_name": "poker", "db_username": "postgres"}
+
+# Imports every module of the generated app, then builds it and prints the first segment of its routes
+IMPORT_PROJECT = """
+import importlib, json, os, run
+for root, dirs, files in os.walk("app"):
+    dirs[:] = [name for name in dirs if name != "__pycache__"]
+    for name in files:
+        if name.endswith(".py"):
+            module = os.path.join(root, name[:-3]).replace(os.sep, ".")
+            importlib.import_module(module[:-len(".__init__")] if module.endswith(".__init__") else module)
+app = run.create_app()
+print(json.dumps(sorted({rule.rule.split("/")[1] for rule in app.url_map.iter_rules()} - {"static"})))
+"""
+
+
+def table(name, columns, foreign_keys=()):
+    return Table(name=name, columns=[Column("id", "integer", is_nullable=False)] + columns, primary_key=["id"],
+                 foreign_keys=list(foreign_keys),
+                 indexes=[Index(f"{name}_pkey", ["id"], is_unique=True, is_primary=True)])
+
+
+def schema(*names):
+    tables = [
+        table("players", [Column("name", "character varying", length=50),
+                          Column("mood", "USER-DEFINED", enum_type="mood")]),
+        table("games", [Column("player_id", "integer")],
+              [ForeignKey("games_player_id_fkey", ["player_id"], "public", "players", ["id"])]),
+        table("moves", [Column("game_id", "integer")],
+              [ForeignKey("moves_game_id_fkey", ["game_id"], "public", "games", ["id"])]),
+    ]
+    return Schema(tables={table.name: table for table in tables if table.name in names}, enums={"mood": ["happy", "sad"]})
+
+
+def generate(options, *tables, incremental=True):
+    save_snapshot("snapshot.json", build_snapshot([schema(*tables)], {}, db_info=CONNECTION))
+    manager = ProjectManager(snapshot_path="snapshot.json", project_name="demo", interactive=False,
+                             incremental=incremental, **options)
+    manager.template_path = os.path.join(ROOT, "templates")
+    manager.run()
+    return manager.project_path
+
+
+def generated_tables(project_path):
+    with open(os.path.join(project_path, "generation_manifest.json")) as file:
+        return sorted(json.load(file)["tables"])
+
+
+def table_files(project_path, name):
+    return [os.path.join(root, file) for root, _, files in os.walk(os.path.join(project_path, "app"))
+            for file in files if file.startswith(f"{name}_")]
+
+
+def routes(project_path):
+    env = {key: value for key, value in os.environ.items() if key != "DATABASE_URL"}
+    result = subprocess.run([sys.executable, "-c", IMPORT_PROJECT], cwd=project_path, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+@pytest.mark.parametrize("options", [{}, {"lazy": True}, {"template_type": "async"}], ids=["default", "lazy", "async"])
+def test_dropped_tables_are_removed_on_incremental_and_full_runs(tmp_path, monkeypatch, options):
+    monkeypatch.chdir(tmp_path)
+    project_path = generate(options, "players", "games", "moves")
+    assert routes(project_path) == ["games", "moves", "players"]
+    assert table_files(project_path, "moves")
+
+    project_path = generate(options, "players", "games")
+    assert generated_tables(project_path) == ["games", "players"]
+    assert table_files(project_path, "moves") == []
+    assert routes(project_path) == ["games", "players"]
+
+    project_path = generate(options, "players", incremental=False)
+    assert generated_tables(project_path) == ["players"]
+    assert table_files(project_path, "games") == []
+    assert routes(project_path) == ["players"]
@@ -1,2 +1,2 @@
-from .file_manager import create_project_folder, write_file, read_file
-from .template_renderer import render_template
+from .file_manager import create_directory, create_project_folder, write_file, read_file
+from .template_renderer import configure_renderer, render_template, shared_renderer
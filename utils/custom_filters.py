@@ -1,6 +1,13 @@
-from typing import Dict
+import re
+from typing import Dict, Iterable, List, Tuple
 
-def map_sqlalchemy_type(column_name: str, pg_type: str, enums: Dict[str, Dict[str, str]]) -> str:
+POSTGRESQL_TYPES = {"JSONB", "ARRAY", "INET", "CIDR", "MACADDR", "TSVECTOR"}
+CORE_TYPES = {
+    "UUID", "String", "Text", "CHAR", "DateTime", "Date", "Integer", "BigInteger", "SmallInteger",
+    "Numeric", "Float", "Boolean", "LargeBinary", "JSON", "Interval", "Time", "Enum"
+}
+
+def map_sqlalchemy_type(column_name: str, pg_type: str, enums: Dict[str, Dict[str, str]], element_type: str = None) -> str:
     mapping = {
         "uuid": "UUID",
         "character varying": "String",
@@ -25,7 +32,6 @@ def map_sqlalchemy_type(column_name: str, pg_type: str, enums: Dict[str, Dict[st
         "interval": "Interval",
         "time without time zone": "Time",
         "time with time zone": "Time(timezone=True)",
-        "array": "ARRAY",  # This might require more specifics depending on the array type
         "inet": "INET",
         "cidr": "CIDR",
         "macaddr": "MACADDR",
@@ -35,7 +41,35 @@ def map_sqlalchemy_type(column_name: str, pg_type: str, enums: Dict[str, Dict[st
     
     # If the PostgreSQL type is 'USER-DEFINED', check if the column_name is one of the enums
     if pg_type == 'USER-DEFINED' and column_name in enums:
-        enum_name = enums[column_name]["name"]
-        return f"Enum({enum_name})"
-    
+        return enums[column_name]["name"]
+
+    if pg_type == 'ARRAY':
+        return f"ARRAY({mapping.get(element_type, 'String')})"
+
     return mapping.get(pg_type, "String")  # Default to String if type not found
+
+# How values of a PostgreSQL type are turned into JSON-friendly values:
+# an inline expression for generated to_dict() code and the equivalent helper for projected rows.
+JSON_ENCODERS = {
+    "uuid": ("str({})", "str"),
+    "numeric": ("str({})", "str"),
+    "decimal": ("str({})", "str"),
+    "timestamp with time zone": ("{}.isoformat()", "isoformat"),
+    "timestamp without time zone": ("{}.isoformat()", "isoformat"),
+    "date": ("{}.isoformat()", "isoformat"),
+    "time with time zone": ("{}.isoformat()", "isoformat"),
+    "time without time zone": ("{}.isoformat()", "isoformat"),
+    "bytea": ("encode_bytes({})", "encode_bytes"),
+    "interval": ("encode_interval({})", "encode_interval"),
+}
+
+def json_encoder_for(pg_type: str) -> Tuple[str, str]:
+    """Inline expression template and helper name encoding a value of the type, (None, None) if it needs none."""
+    return JSON_ENCODERS.get(pg_type, (None, None))
+
+def sqlalchemy_imports(type_expressions: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Splits the type names used in the given expressions into sqlalchemy and postgresql dialect imports."""
+    names = set()
+    for expression in type_expressions:
+        names.update(re.findall(r'[A-Za-z_]+', expression))
+    return sorted(names & CORE_TYPES), sorted(names & POSTGRESQL_TYPES)
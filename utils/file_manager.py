@@ -1,7 +1,31 @@
 import os
+import shutil
+from typing import List
+from .output_writer import active_writer
+from .profiler import record_write
+
+def staged_path(path: str):
+    """The active output writer with the path relative to its root, (None, None) outside of a staging session or root."""
+    return active_writer(path)
 
 def path_exists(path: str) -> bool:
-    return os.path.exists(path)
+    writer, relative = staged_path(path)
+    return writer.exists(relative) if writer else os.path.exists(path)
+
+def list_directory(path: str) -> List[str]:
+    """Names in a directory, including the ones staged and excluding the ones about to be removed."""
+    writer, relative = staged_path(path)
+    return writer.listdir(relative) if writer else sorted(os.listdir(path))
+
+def create_directory(path: str) -> bool:
+    """Creates a directory and its parents, on commit inside an output writer session. Returns whether it was missing."""
+    writer, relative = staged_path(path)
+    if writer:
+        return writer.make_directory(relative)
+    if os.path.isdir(path):
+        return False
+    os.makedirs(path)
+    return True
 
 def create_project_folder(project_name: str) -> None:
     project_path = os.path.join("projects", project_name)
@@ -9,28 +33,67 @@ def create_project_folder(project_name: str) -> None:
 
 
 def read_file(file_path: str) -> str:
+    """Content of a file, as staged by the active output writer if it wrote the file."""
+    writer, relative = staged_path(file_path)
+    if writer:
+        file_path = writer.source(relative)
     with open(file_path, 'r') as file:
         return file.read()
 
-def write_file(file_path: str, content: str):
+def write_file(file_path: str, content: str) -> bool:
     """
-    Writes content to the specified file. If the file already exists, it will be deleted first.
+    Writes content to the specified file. A file that already holds exactly this content is left untouched.
+
+    Inside an output writer session, files below its root are staged and moved into
+    place when the session commits, see OutputWriter.
 
     Args:
     - file_path (str): Path where the file should be saved.
     - content (str): Content to write to the file.
+
+    Returns:
+    - bool: True if the file was written, False if it was already up to date.
     """
-    
-    # Check if the file already exists and delete it
+    writer, relative = staged_path(file_path)
+    if writer:
+        written = writer.write(relative, content)
+        if written:
+            record_write(content)
+        return written
+
     if os.path.exists(file_path):
-        os.remove(file_path)
+        with open(file_path, 'r') as file:
+            if file.read() == content:
+                return False
+    else:
+        # Create directories if they don't exist
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
 
-    # Create directories if they don't exist
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    
     with open(file_path, 'w') as file:
         file.write(content)
-        
+    record_write(content)
+    return True
+
+def remove_file(file_path: str) -> bool:
+    writer, relative = staged_path(file_path)
+    if writer:
+        return writer.remove(relative)
+    if not os.path.exists(file_path):
+        return False
+    os.remove(file_path)
+    return True
+
+def remove_directory(path: str) -> bool:
+    writer, relative = staged_path(path)
+    if writer:
+        return writer.remove_directory(relative)
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
 def append_to_file(file_path: str, content: str) -> None:
     with open(file_path, 'a') as file:
         file.write(content)
@@ -0,0 +1,246 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Open sessions, one per project root, so that several projects can be generated side by side
+_active: List["OutputWriter"] = []
+_active_lock = threading.Lock()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as file:
+            return content_hash(file.read())
+    except FileNotFoundError:
+        return None
+
+
+class OutputWriter:
+    """
+    Stages every file written under a project directory and swaps them in at the end.
+
+    While a session is open, writes below the root land in a staging tree next to it, on
+    the same filesystem, unless the file already holds the same content, in which case
+    nothing is written at all. Removals and new directories are recorded. Committing creates
+    the missing directories once each, moves every staged file into place with an atomic os.replace()
+    and only then applies the removals, so a process watching the project never reads a
+    half-written file, and a run that fails leaves the project as it was.
+
+    Swapped directories are committed as a whole: the staging tree is completed with links
+    to their unchanged files, then renamed over the live directory, so readers see either
+    the old or the new tree and never a mix. Files listed as last, e.g. a manifest of what
+    was generated, are moved in after everything else, so a commit interrupted midway
+    leaves the previous one in place for the next run to compare against.
+    """
+
+    def __init__(self, root: str, swapped: Iterable[str] = (), last: Iterable[str] = ()):
+        self.root = os.path.normpath(root)
+        self.swapped = [os.path.normpath(name) for name in swapped]
+        self.last = {os.path.normpath(name) for name in last}
+        self.staging_path = None
+        self.staged: Dict[str, int] = {}  # relative path -> bytes
+        self.directories: Set[str] = set()
+        self.removed: Set[str] = set()
+        self.removed_directories: Set[str] = set()
+        self.skipped: Dict[str, int] = {}
+        self._staging_directories: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        """Makes this the active writer of its root; commits on success and discards the staged files on error."""
+        parent = os.path.dirname(self.root) or "."
+        os.makedirs(parent, exist_ok=True)
+        self.staging_path = tempfile.mkdtemp(prefix=f".{os.path.basename(self.root)}.", suffix=".staging", dir=parent)
+        with _active_lock:
+            _active.append(self)
+        try:
+            yield self
+            self._deactivate()
+            self.commit()
+        finally:
+            self._deactivate()
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+
+    def _deactivate(self):
+        with _active_lock:
+            if self in _active:
+                _active.remove(self)
+
+    def relative(self, path: str) -> Optional[str]:
+        """The path relative to the root, None when it lies outside of it."""
+        relative = os.path.relpath(os.path.normpath(path), self.root)
+        return None if relative == os.pardir or relative.startswith(os.pardir + os.sep) else relative
+
+    def write(self, relative: str, content: str) -> bool:
+        """Stages a file unless the project already holds the same content. Returns whether it will be written."""
+        data = content.encode("utf-8")
+        with self._lock:
+            self.removed.discard(relative)
+            if not self._removed_with_directory(relative) and \
+                    file_hash(os.path.join(self.root, relative)) == content_hash(data):
+                self.staged.pop(relative, None)
+                self.skipped[relative] = len(data)
+                return False
+            staged_path = os.path.join(self.staging_path, relative)
+            directory = os.path.dirname(staged_path)
+            if directory not in self._staging_directories:
+                os.makedirs(directory, exist_ok=True)
+                self._staging_directories.add(directory)
+            with open(staged_path, "wb") as file:
+                file.write(data)
+            self.skipped.pop(relative, None)
+            self.staged[relative] = len(data)
+            return True
+
+    def make_directory(self, relative: str) -> bool:
+        """Records a directory to create on commit, even if no file ends up in it. Returns whether it is new."""
+        with self._lock:
+            self.removed_directories.discard(relative)
+            if relative in self.directories or os.path.isdir(os.path.join(self.root, relative)):
+                return False
+            self.directories.add(relative)
+            return True
+
+    def remove(self, relative: str) -> bool:
+        with self._lock:
+            if relative in self.staged:
+                os.remove(os.path.join(self.staging_path, relative))
+                del self.staged[relative]
+            if not os.path.exists(os.path.join(self.root, relative)) or relative in self.removed:
+                return False
+            self.removed.add(relative)
+            return True
+
+    def remove_directory(self, relative: str) -> bool:
+        with self._lock:
+            if not os.path.isdir(os.path.join(self.root, relative)):
+                return False
+            self.removed_directories.add(relative)
+            return True
+
+    def _removed_with_directory(self, relative: str) -> bool:
+        return any(relative.startswith(directory + os.sep) for directory in self.removed_directories)
+
+    def exists(self, relative: str) -> bool:
+        with self._lock:
+            if relative in self.staged or relative in self.directories or \
+                    any(name.startswith(relative + os.sep) for name in self.staged.keys() | self.directories):
+                return True
+            if relative in self.removed or self._removed_with_directory(relative) or relative in self.removed_directories:
+                return False
+            return os.path.exists(os.path.join(self.root, relative))
+
+    def source(self, relative: str) -> str:
+        """Path holding the current content of a file: its staged copy if there is one, else the file itself."""
+        with self._lock:
+            return os.path.join(self.staging_path if relative in self.staged else self.root, relative)
+
+    def listdir(self, relative: str) -> List[str]:
+        """Entries of a directory as the project will hold them once committed."""
+        path = os.path.join(self.root, relative)
+        prefix = "" if relative == os.curdir else relative + os.sep
+        with self._lock:
+            entries = set(os.listdir(path)) if os.path.isdir(path) else set()
+            entries = {name for name in entries if not self._is_removed(prefix + name)}
+            entries |= {name[len(prefix):].split(os.sep, 1)[0] for name in self.staged.keys() | self.directories
+                        if name.startswith(prefix) and name != os.curdir}
+        return sorted(entries)
+
+    def _is_removed(self, relative: str) -> bool:
+        return relative in self.removed or relative in self.removed_directories or self._removed_with_directory(relative)
+
+    def _in_directory(self, relative: str, directory: str) -> bool:
+        return relative == directory or relative.startswith(directory + os.sep)
+
+    def _complete_staged_directory(self, directory: str):
+        """Fills in the staged copy of a directory with links to its live files that are neither rewritten nor removed."""
+        live_root = os.path.join(self.root, directory)
+        for root, dirs, files in os.walk(live_root):
+            relative_root = os.path.relpath(root, self.root)
+            dirs[:] = [name for name in dirs if not self._is_removed(os.path.join(relative_root, name))]
+            os.makedirs(os.path.join(self.staging_path, relative_root), exist_ok=True)
+            for name in files:
+                relative = os.path.join(relative_root, name)
+                if relative in self.staged or self._is_removed(relative):
+                    continue
+                try:
+                    os.link(os.path.join(root, name), os.path.join(self.staging_path, relative))
+                except OSError:
+                    # Filesystems without hard links get a copy
+                    shutil.copy2(os.path.join(root, name), os.path.join(self.staging_path, relative))
+        for name in self.directories:
+            if self._in_directory(name, directory):
+                os.makedirs(os.path.join(self.staging_path, name), exist_ok=True)
+
+    def _swap_directory(self, directory: str):
+        """Replaces a live directory with its completed staged copy, the previous tree left in staging for cleanup."""
+        self._complete_staged_directory(directory)
+        live_path = os.path.join(self.root, directory)
+        os.makedirs(os.path.dirname(live_path), exist_ok=True)
+        if os.path.isdir(live_path):
+            os.rename(live_path, os.path.join(self.staging_path, f".previous.{os.path.basename(directory)}"))
+        os.rename(os.path.join(self.staging_path, directory), live_path)
+
+    def commit(self):
+        changes = list(self.staged) + list(self.directories) + list(self.removed) + list(self.removed_directories)
+        swapped = [directory for directory in self.swapped
+                   if any(self._in_directory(name, directory) for name in changes)]
+        for directory in swapped:
+            self._swap_directory(directory)
+
+        def pending(names):
+            return sorted(name for name in names if not any(self._in_directory(name, directory) for directory in swapped))
+
+        targets = [name for name in pending(self.staged) if name not in self.last]
+        last = [name for name in pending(self.staged) if name in self.last]
+        # Each missing directory is created once, parents first
+        directories = {os.path.dirname(os.path.join(self.root, name)) for name in targets + last}
+        directories |= {os.path.normpath(os.path.join(self.root, name)) for name in pending(self.directories)}
+        for directory in sorted(directories):
+            os.makedirs(directory, exist_ok=True)
+        for name in targets:
+            os.replace(os.path.join(self.staging_path, name), os.path.join(self.root, name))
+        for name in pending(self.removed):
+            path = os.path.join(self.root, name)
+            if os.path.exists(path):
+                os.remove(path)
+        for name in pending(self.removed_directories):
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        for name in last:
+            os.replace(os.path.join(self.staging_path, name), os.path.join(self.root, name))
+
+        report = self.report()
+        logging.info(f"Wrote {report['files_written']} file(s) ({report['bytes_written']:,} bytes), skipped "
+                     f"{report['files_skipped']} unchanged file(s) ({report['bytes_skipped']:,} bytes), removed "
+                     f"{report['files_removed']} file(s) and {report['directories_removed']} directory(ies).")
+
+    def report(self) -> Dict:
+        return {
+            "files_written": len(self.staged),
+            "bytes_written": sum(self.staged.values()),
+            "files_skipped": len(self.skipped),
+            "bytes_skipped": sum(self.skipped.values()),
+            "files_removed": len(self.removed),
+            "directories_removed": len(self.removed_directories),
+        }
+
+
+def active_writer(path: str) -> Tuple[Optional[OutputWriter], Optional[str]]:
+    """The active writer whose root holds the path, with the path relative to that root, (None, None) if there is none."""
+    with _active_lock:
+        writers = list(_active)
+    for writer in writers:
+        relative = writer.relative(path)
+        if relative is not None:
+            return writer, relative
+    return None, None
@@ -0,0 +1,131 @@
+import cProfile
+import json
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+COUNTERS = ("queries", "query_time", "renders", "render_time", "files_written", "bytes_written")
+
+_active: Optional["Profiler"] = None
+
+
+def _cpu_time() -> float:
+    """CPU time of this process and of its finished worker processes."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+class Profiler:
+    """
+    Records where a generator run spends its time, phase by phase and table by table.
+
+    Each phase gets its wall and CPU time plus the catalog queries (with their round
+    trip time), template renders and file writes made while it ran. The low-level
+    helpers report to the active profiler through the record_* functions below, which
+    do nothing when no profiler is active, so the instrumentation costs nothing by default.
+    """
+
+    def __init__(self, cprofile_path: str = None):
+        self.cprofile_path = cprofile_path
+        self.phases: List[Dict] = []
+        self.tables: Dict[str, Dict] = {}
+        self._totals = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+        self._started = None
+        self._started_at = None
+        self._wall_time = None
+        self._cprofile = None
+
+    @contextmanager
+    def session(self):
+        """Makes this the active profiler, with cProfile running if a dump path was given."""
+        global _active
+        _active = self
+        self._started = time.perf_counter()
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        if self.cprofile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        try:
+            yield self
+        finally:
+            self._wall_time = time.perf_counter() - self._started
+            if self._cprofile:
+                self._cprofile.disable()
+                self._cprofile.dump_stats(self.cprofile_path)
+            _active = None
+
+    @contextmanager
+    def phase(self, name: str):
+        before = dict(self._totals)
+        started, cpu_started = time.perf_counter(), _cpu_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - started, _cpu_time() - cpu_started
+            with self._lock:
+                delta = {key: self._totals[key] - before[key] for key in COUNTERS}
+            self.phases.append({
+                "name": name,
+                "start": round(started - (self._started or started), 4),
+                "wall_time": round(wall, 4),
+                "cpu_time": round(cpu, 4),
+                **{key: round(value, 4) if isinstance(value, float) else value for key, value in delta.items()},
+            })
+
+    def add(self, **counters):
+        with self._lock:
+            for key, value in counters.items():
+                self._totals[key] += value
+
+    def add_table(self, table_name: str, elapsed: float, bytes_written: int, written: bool):
+        """Counts one file rendered for a table, elapsed covering both its rendering and its writing."""
+        with self._lock:
+            table = self.tables.setdefault(table_name, {"renders": 0, "time": 0.0,
+                                                         "files_written": 0, "bytes_written": 0})
+            table["renders"] += 1
+            table["time"] += elapsed
+            table["files_written"] += written
+            table["bytes_written"] += bytes_written
+
+    def report(self) -> Dict:
+        tables = {name: {**stats, "time": round(stats["time"], 4)}
+                  for name, stats in sorted(self.tables.items(), key=lambda item: -item[1]["time"])}
+        return {
+            "started_at": self._started_at,
+            "wall_time": round(self._wall_time or 0, 4),
+            "totals": {key: round(value, 4) if isinstance(value, float) else value
+                       for key, value in self._totals.items()},
+            "phases": self.phases,
+            # Slowest tables first
+            "tables": tables,
+            "cprofile": self.cprofile_path,
+        }
+
+    def write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            file.write(json.dumps(self.report(), indent=2) + "\n")
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _active
+
+
+def record_query(elapsed: float) -> None:
+    if _active is not None:
+        _active.add(queries=1, query_time=elapsed)
+
+
+def record_render(elapsed: float) -> None:
+    if _active is not None:
+        _active.add(renders=1, render_time=elapsed)
+
+
+def record_write(content: str) -> None:
+    if _active is not None:
+        _active.add(files_written=1, bytes_written=len(content.encode("utf-8")))
@@ -1,6 +1,75 @@
-from typing import Dict
-from jinja2 import Environment, FileSystemLoader
+import os
+import time
+from typing import Dict, Optional, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from .custom_filters import map_sqlalchemy_type
+from .profiler import record_render
+
+TEMPLATES_DIR = "templates"
+
+_environment: Optional[Environment] = None
+_settings: Tuple[str, Optional[str]] = (TEMPLATES_DIR, None)
+
+
+def configure_renderer(templates_dir: str = TEMPLATES_DIR, bytecode_cache_dir: Optional[str] = None) -> Environment:
+    """
+    Creates the process-wide Jinja2 environment used by render_template.
+
+    Templates are compiled once per process and kept in memory. With a bytecode
+    cache directory, compiled templates are also stored on disk so later runs
+    skip compilation entirely.
+
+    Args:
+    - templates_dir (str): Directory containing the templates.
+    - bytecode_cache_dir (Optional[str]): Directory for the on-disk bytecode cache, disabled if None.
+
+    Returns:
+    - Environment: The configured environment.
+    """
+    global _environment, _settings
+
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+
+    # Templates don't change during a run, so never stat them for changes and never evict them
+    environment = Environment(
+        loader=FileSystemLoader(templates_dir),
+        bytecode_cache=bytecode_cache,
+        auto_reload=False,
+        cache_size=-1,
+    )
+    environment.filters["map_sqlalchemy_type"] = map_sqlalchemy_type
+    environment.globals["map_sqlalchemy_type"] = map_sqlalchemy_type
+
+    _environment = environment
+    _settings = (templates_dir, bytecode_cache_dir)
+    return environment
+
+
+def shared_renderer(templates_dir: str = TEMPLATES_DIR, bytecode_cache_dir: Optional[str] = None) -> Environment:
+    """
+    The process-wide environment if it was configured with the same arguments, a new one otherwise.
+
+    Projects generated one after the other in the same process, e.g. by a batch, then
+    share the templates compiled for the first one.
+    """
+    if _environment is not None and _settings == (templates_dir, bytecode_cache_dir):
+        return _environment
+    return configure_renderer(templates_dir, bytecode_cache_dir)
+
+
+def renderer_settings() -> Tuple[str, Optional[str]]:
+    """Arguments of the last configure_renderer call, used to configure worker processes the same way."""
+    return _settings
+
+
+def get_environment() -> Environment:
+    if _environment is None:
+        configure_renderer()
+    return _environment
+
 
 def render_template(template_path: str, context: Dict[str, object]) -> str:
     """
@@ -13,15 +82,7 @@ def render_template(template_path: str, context: Dict[str, object]) -> str:
     Returns:
     - str: Rendered template content.
     """
-    # Set up the environment with the templates directory
-    env = Environment(loader=FileSystemLoader('templates'))
-    env.filters["map_sqlalchemy_type"] = map_sqlalchemy_type
-
-    # Add the mapping function directly to the context
-    context['map_sqlalchemy_type'] = map_sqlalchemy_type
-
-    # Load the specified template
-    template = env.get_template(template_path)
-    
-    # Render the template with the provided context
-    return template.render(context)
+    started = time.perf_counter()
+    rendered = get_environment().get_template(template_path).render(context)
+    record_render(time.perf_counter() - started)
+    return rendered